@@ -0,0 +1,240 @@
+"""
+Benchmarks for the Contact Management System hot paths
+CS1350 Week 1 Homework
+
+Builds synthetic contact databases of the requested sizes and measures
+throughput, latency percentiles and peak traced memory for each operation.
+Results are printed as one JSON object per line so runs of different
+versions can be compared, e.g.:
+
+    python benchmark_hW.py --sizes 10000 100000 --output bench_output.txt
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import hW as cm
+
+FIRST_NAMES = ['James', 'Mary', 'John', 'Patricia', 'Robert', 'Jennifer', 'Michael',
+               'Linda', 'William', 'Elizabeth', 'David', 'Barbara', 'Richard', 'Susan',
+               'Joseph', 'Jessica', 'Thomas', 'Sarah', 'Charles', 'Karen']
+LAST_NAMES = ['Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller',
+              'Davis', 'Rodriguez', 'Martinez', 'Hernandez', 'Lopez', 'Gonzalez',
+              'Wilson', 'Anderson', 'Thomas', 'Taylor', 'Moore', 'Jackson', 'Martin']
+STATES = ['CA', 'NY', 'TX', 'FL', 'IL', 'PA', 'OH', 'GA', 'NC', 'MI']
+CATEGORIES = ['personal', 'work', 'family']
+
+def generate_contacts(count, seed=1350):
+    """
+    Generate reproducible synthetic contacts.
+
+    Args:
+        count (int): Number of contacts
+        seed (int): Random seed, so every run sees the same data
+
+    Returns:
+        list: Contact dictionaries in the create_contact() layout
+    """
+    rng = random.Random(seed)
+    contacts = []
+    for i in range(count):
+        first_name = rng.choice(FIRST_NAMES) + str(rng.randrange(count // 20 + 1))
+        last_name = rng.choice(LAST_NAMES)
+        date = f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+        contacts.append({
+            'first_name': first_name,
+            'last_name': last_name,
+            'phone': f"{rng.randint(200, 999)}-{rng.randint(200, 999)}-{rng.randint(0, 9999):04d}",
+            'email': f"{first_name.lower()}.{last_name.lower()}{i}@example.com" if rng.random() < 0.8 else '',
+            'address': {
+                'street': f"{rng.randint(1, 9999)} Main St",
+                'city': f"City{rng.randrange(200)}",
+                'state': rng.choice(STATES),
+                'zip_code': f"{rng.randint(10000, 99999)}"
+            } if rng.random() < 0.7 else {},
+            'category': rng.choice(CATEGORIES),
+            'notes': '',
+            'created_date': date,
+            'last_modified': date
+        })
+    return contacts
+
+def build_database(contacts):
+    """Load generated contacts into a fresh indexed database."""
+    contacts_db = cm.ContactDatabase()
+    cm.add_contacts_bulk(contacts_db, contacts)
+    return contacts_db
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+def measure(operation, size, calls, setup=None):
+    """
+    Time an operation call by call, then trace its peak memory.
+
+    Args:
+        operation (callable): Takes the call number, runs one operation
+        size (int): Database size, for the report
+        calls (int): Number of timed calls
+        setup (callable): Optional function run before each pass
+
+    Returns:
+        dict: Throughput, latency percentiles and peak memory
+    """
+    if setup:
+        setup()
+    latencies = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        for call in range(calls):
+            call_start = time.perf_counter()
+            operation(call)
+            latencies.append(time.perf_counter() - call_start)
+        elapsed = time.perf_counter() - start
+
+    # Separate pass so tracing does not distort the timings
+    if setup:
+        setup()
+    tracemalloc.start()
+    with contextlib.redirect_stdout(io.StringIO()):
+        operation(0)
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        'size': size,
+        'calls': calls,
+        'ops_per_sec': round(calls / elapsed, 2) if elapsed else None,
+        'latency_ms': {
+            'mean': round(statistics.fmean(latencies) * 1000, 4),
+            'p50': round(percentile(latencies, 0.50) * 1000, 4),
+            'p95': round(percentile(latencies, 0.95) * 1000, 4),
+            'p99': round(percentile(latencies, 0.99) * 1000, 4),
+            'max': round(latencies[-1] * 1000, 4),
+        },
+        'peak_memory_bytes': peak_memory,
+    }
+
+def run_benchmarks(size, queries, seed, operations=None):
+    """
+    Benchmark every hot path on a database of the given size.
+
+    Args:
+        size (int): Number of contacts
+        queries (int): Calls per lookup operation
+        seed (int): Random seed for the data and the queries
+        operations (list): Optional operation names to run, 'files' for
+            the save/load/open benchmarks; all of them by default
+
+    Yields:
+        dict: One result per operation
+    """
+    contacts = generate_contacts(size, seed)
+    rng = random.Random(seed)
+    sample = [contacts[rng.randrange(size)] for _ in range(queries)]
+    state = {'db': build_database(contacts)}
+
+    def fresh_database():
+        state['db'] = build_database(contacts)
+
+    def add_one(call):
+        cm.add_contact(state['db'], dict(sample[call % len(sample)]))
+
+    def bulk_import(call):
+        cm.add_contacts_bulk(cm.ContactDatabase(), contacts)
+
+    results = [
+        ('add_contact', add_one, queries, fresh_database),
+        ('add_contacts_bulk', bulk_import, 1, None),
+        ('search_contacts_by_name',
+         lambda call: cm.search_contacts_by_name(state['db'], sample[call]['first_name'][:4]),
+         queries, fresh_database),
+        ('search_contacts_ranked',
+         lambda call: cm.search_contacts_ranked(state['db'], sample[call]['first_name'][:4]),
+         queries, None),
+        ('search_contacts_by_category',
+         lambda call: cm.search_contacts_by_category(state['db'], sample[call]['category']),
+         min(queries, 20), None),
+        ('find_contact_by_phone',
+         lambda call: cm.find_contact_by_phone(state['db'], sample[call]['phone']),
+         queries, None),
+        ('find_duplicate_contacts',
+         lambda call: cm.find_duplicate_contacts(state['db']), 1, None),
+        ('find_fuzzy_duplicate_contacts',
+         lambda call: cm.find_fuzzy_duplicate_contacts(state['db']), 1, None),
+        ('generate_contact_statistics',
+         lambda call: cm.generate_contact_statistics(state['db']), queries, None),
+        ('generate_contact_statistics_rescan',
+         lambda call: cm.generate_contact_statistics(state['db'], rescan=True), 3, None),
+    ]
+    for name, operation, calls, setup in results:
+        if not operations or name in operations:
+            yield dict(operation=name, **measure(operation, size, calls, setup))
+
+    if operations and 'files' not in operations:
+        return
+    directory = tempfile.mkdtemp()
+    try:
+        for file_format in ('text', 'binary'):
+            filename = os.path.join(directory, f'contacts.{file_format}')
+            yield dict(operation=f'save_contacts_to_file[{file_format}]', **measure(
+                lambda call: cm.save_contacts_to_file(state['db'], filename, file_format),
+                size, 1))
+            yield dict(operation=f'load_contacts_from_file[{file_format}]', **measure(
+                lambda call: cm.load_contacts_from_file(filename), size, 1))
+            if file_format == 'binary':
+                yield dict(operation='open_contacts_file', **measure(
+                    lambda call: cm.open_contacts_file(filename).close(), size, queries))
+                with cm.open_contacts_file(filename) as mapped:
+                    sample_ids = [f'contact_{rng.randrange(1, size + 1):03d}' for _ in range(queries)]
+                    yield dict(operation='mapped_contact_lookup', **measure(
+                        lambda call: mapped[sample_ids[call]], size, queries))
+            os.remove(filename)
+    finally:
+        os.rmdir(directory)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000],
+                        help='database sizes to benchmark')
+    parser.add_argument('--queries', type=int, default=200,
+                        help='calls per lookup operation')
+    parser.add_argument('--seed', type=int, default=1350)
+    parser.add_argument('--operations', nargs='+',
+                        help="only run these operations ('files' for the file formats), "
+                             "e.g. --sizes 1000000 --operations find_fuzzy_duplicate_contacts")
+    parser.add_argument('--output', help='append results to this file instead of stdout')
+    args = parser.parse_args()
+
+    out = open(args.output, 'a') if args.output else sys.stdout
+    try:
+        out.write(json.dumps({
+            'benchmark': 'contact_manager',
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'seed': args.seed,
+        }) + '\n')
+        for size in args.sizes:
+            for result in run_benchmarks(size, args.queries, args.seed, args.operations):
+                out.write(json.dumps(result) + '\n')
+                out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+if __name__ == "__main__":
+    main()
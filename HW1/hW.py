@@ -2,12 +2,874 @@
 CS1350 Week 1 Homework: Dictionary Operations
 """
 
+import array
+import bisect
+import contextlib
+import copy
+import csv
 import datetime
+import gc
+import heapq
+import importlib.util
+import io
+import json
+import mmap
+import os
 import re
+import struct
+import sys
+import threading
 from collections import defaultdict
+from collections.abc import Mapping
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+# The shared validator registry lives in the repository root. It is loaded
+# from there by path, once for all homework modules, rather than by putting
+# the repository root on sys.path
+validators = sys.modules.get('cs1350_validators')
+if validators is None:
+    _spec = importlib.util.spec_from_file_location('cs1350_validators', os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'cs1350_validators.py'))
+    validators = importlib.util.module_from_spec(_spec)
+    sys.modules['cs1350_validators'] = validators
+    _spec.loader.exec_module(validators)
+
+validators.register('contact_phone', r'^\d{3}-\d{3}-\d{4}$')
+validators.register('contact_email', r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
+# Fuzzy duplicate detection helpers
+NON_DIGITS = re.compile(r'\D')
+NON_LETTERS = re.compile(r'[^a-z]')
+# Soundex digit per letter; vowels map to '0' (dropped later) and h/w are removed
+SOUNDEX_TABLE = str.maketrans('abcdefgijklmnopqrstuvxyz', '012301202245501262301202', 'hw')
+
+# Text contacts files start with a 'format: 2' line. Values in those files
+# are written on one line, with backslashes, newlines and carriage returns
+# escaped; files without the line predate escaping and are read literally.
+TEXT_FORMAT_VERSION = '2'
+TEXT_VALUE_ESCAPE = re.compile(r'\\([\\nr])')
+TEXT_VALUE_UNESCAPES = {'\\': '\\', 'n': '\n', 'r': '\r'}
+
+# Binary contacts file layout:
+#   header  - magic (with the format version in its last byte), next contact
+#             number, record count, index offset, length of the ID block
+#             and length of the string table
+#   records - 4-byte length of the rest of the record and a kind byte, then
+#             for contacts with exactly the create_contact() fields, all
+#             strings: four 4-byte string table numbers (category, state,
+#             created_date, last_modified) and the UTF-8 contact ID and
+#             CompactContact.TEXT_FIELDS joined by CompactContact.SEPARATOR.
+#             The kind is then the CompactContact address flags. Any other
+#             contact is stored as compact JSON [contact_id, contact].
+#   index   - the contact IDs sorted by their UTF-8 bytes, back to back,
+#             the string table (distinct interned strings, joined by the
+#             separator), then four arrays of 8-byte integers: where each
+#             sorted ID starts in the ID block (plus the block end), the
+#             record number of each sorted ID, the sorted position of each
+#             record's ID and the offset of each record
+BINARY_FILE_MAGIC = b'CONTACT\x02'
+BINARY_HEADER = struct.Struct('<8sQQQQQ')
+BINARY_RECORD = struct.Struct('<IB')
+BINARY_RECORD_STRINGS = struct.Struct('<IIII')
+BINARY_JSON_RECORD = 0x80
+
+# Format of new contacts files; saving over an existing file keeps its format
+DEFAULT_FILE_FORMAT = 'binary'
+
+# Pending name additions/removals above which the sorted name lists used by
+# ranked search are rebuilt instead of patched one name at a time
+NAME_ORDER_REBUILD = 256
+
+class CompactContact(Mapping):
+    """
+    Read-only, memory-compact stand-in for a contact dictionary.
+
+    All free-text fields share one string, category and state are interned
+    and both dates are packed into a single integer, which takes several
+    times less memory than a dict with a nested address dict. Supports the
+    dict-style reads used throughout this module (contact['phone'],
+    contact['address']['city'], .get(), .items(), ...); use to_dict() or
+    update_contact() to change it.
+    """
+    __slots__ = ('_text', '_category', '_state', '_dates', '_flags')
+
+    TEXT_FIELDS = ('first_name', 'last_name', 'phone', 'email', 'notes',
+                   'street', 'city', 'zip_code')
+    ADDRESS_FIELDS = ('street', 'city', 'state', 'zip_code')
+    KEYS = ('first_name', 'last_name', 'phone', 'email', 'address',
+            'category', 'notes', 'created_date', 'last_modified')
+    SEPARATOR = '\x1f'
+    _DATE = re.compile(r'^(\d{4})-(\d{2})-(\d{2})$')
+
+    @classmethod
+    def from_dict(cls, contact):
+        """
+        Build a compact record from a contact dictionary.
+
+        Args:
+            contact (dict): Contact information dictionary
+
+        Returns:
+            CompactContact: The compact record, or None if the contact has
+            fields or values this layout cannot hold exactly
+        """
+        if set(contact) != set(cls.KEYS):
+            return None
+        address = contact['address']
+        if not isinstance(address, dict) or not set(address) <= set(cls.ADDRESS_FIELDS):
+            return None
+        
+        values = [contact[field] for field in cls.TEXT_FIELDS[:5]]
+        values += [address.get(field, '') for field in cls.TEXT_FIELDS[5:]]
+        values += [contact['category'], address.get('state', '')]
+        if not all(isinstance(value, str) and cls.SEPARATOR not in value for value in values):
+            return None
+        
+        dates = []
+        for field in ('created_date', 'last_modified'):
+            match = cls._DATE.match(contact[field]) if isinstance(contact[field], str) else None
+            if match is None:
+                return None
+            dates.append(int(''.join(match.groups())))
+        
+        flags = 1 if address else 0
+        for bit, field in enumerate(cls.ADDRESS_FIELDS, 1):
+            if field in address:
+                flags |= 1 << bit
+        
+        record = cls.__new__(cls)
+        record._text = cls.SEPARATOR.join(values[:8])
+        record._category = sys.intern(values[8])
+        record._state = sys.intern(values[9])
+        record._dates = dates[0] * 100000000 + dates[1]
+        record._flags = flags
+        return record
+
+    @staticmethod
+    def _format_date(packed):
+        return f"{packed // 10000:04d}-{packed // 100 % 100:02d}-{packed % 100:02d}"
+
+    def __getitem__(self, key):
+        if key in ('first_name', 'last_name', 'phone', 'email', 'notes'):
+            return self._text.split(self.SEPARATOR)[self.TEXT_FIELDS.index(key)]
+        if key == 'address':
+            return self._address()
+        if key == 'category':
+            return self._category
+        if key == 'created_date':
+            return self._format_date(self._dates // 100000000)
+        if key == 'last_modified':
+            return self._format_date(self._dates % 100000000)
+        raise KeyError(key)
+
+    def _address(self):
+        if not self._flags & 1:
+            return {}
+        values = self._text.split(self.SEPARATOR)
+        stored = {'street': values[5], 'city': values[6],
+                  'state': self._state, 'zip_code': values[7]}
+        return {field: stored[field] for bit, field in enumerate(self.ADDRESS_FIELDS, 1)
+                if self._flags & (1 << bit)}
+
+    def __iter__(self):
+        return iter(self.KEYS)
+
+    def __len__(self):
+        return len(self.KEYS)
+
+    def __contains__(self, key):
+        return key in self.KEYS
+
+    def to_dict(self):
+        """
+        Returns:
+            dict: An ordinary, editable contact dictionary
+        """
+        return {key: self[key] for key in self.KEYS}
+
+    def __repr__(self):
+        return f"CompactContact({self.to_dict()!r})"
+
+def compact_contact(contact):
+    """
+    Convert a contact dictionary to a CompactContact when possible.
+    
+    Args:
+        contact (dict): Contact information dictionary
+        
+    Returns:
+        CompactContact or dict: The compact record, or the original
+        dictionary if it does not fit the compact layout
+    """
+    if isinstance(contact, CompactContact):
+        return contact
+    return CompactContact.from_dict(contact) or contact
+
+def compact_contacts(contacts_db):
+    """
+    Replace every contact in the database with its compact form.
+    
+    Args:
+        contacts_db (dict): The main contacts database
+        
+    Returns:
+        int: Number of contacts now stored compactly
+    """
+    compacted = 0
+    for contact_id in list(contacts_db):
+        contact = contacts_db[contact_id]
+        compact = compact_contact(contact)
+        if compact is not contact:
+            contacts_db[contact_id] = compact
+        if isinstance(compact, CompactContact):
+            compacted += 1
+    return compacted
+
+def contact_json_default(obj):
+    """JSON encoder hook that writes CompactContact records as dicts."""
+    if isinstance(obj, CompactContact):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+class ContactIdAllocator:
+    """
+    Monotonic allocator for 'contact_NNN' IDs.
+
+    Remembers the next free number so new IDs cost O(1) instead of a scan
+    over every key, and never hands out a number again after the contact
+    that used it was deleted or merged away.
+    """
+
+    def __init__(self, next_number=1):
+        self.next_number = next_number
+
+    @staticmethod
+    def format_id(number):
+        return f'contact_{number:03d}'
+
+    def observe(self, contact_id):
+        """
+        Move past an ID that was inserted from outside the allocator.
+
+        Args:
+            contact_id (str): An existing contact ID
+        """
+        try:
+            number = int(contact_id.split('_')[1])
+        except (IndexError, ValueError, AttributeError):
+            return
+        if number >= self.next_number:
+            self.next_number = number + 1
+
+    def allocate(self):
+        """
+        Returns:
+            str: A new, never used contact ID
+        """
+        return self.reserve(1)[0]
+
+    def reserve(self, count):
+        """
+        Reserve a block of consecutive IDs in one step.
+
+        Args:
+            count (int): Number of IDs to reserve
+
+        Returns:
+            list: The reserved contact IDs
+        """
+        start = self.next_number
+        self.next_number += count
+        return [self.format_id(number) for number in range(start, start + count)]
+
+class ContactStatistics:
+    """
+    Running counters behind generate_contact_statistics().
+
+    Updated by ContactDatabase on every insert, update and delete, so the
+    statistics are read in O(categories + states + area codes) instead of
+    rescanning every contact.
+    """
+
+    def __init__(self):
+        self.total_contacts = 0
+        self.contacts_without_email = 0
+        self.contacts_by_category = {}
+        self.contacts_by_state = {}
+        self.area_codes = {}
+        # First area code with the highest count, None until snapshot()
+        # looks for it again
+        self._most_common_area_code = None
+        self._contributions = {}
+
+    @staticmethod
+    def _count(counter, key, change):
+        count = counter.get(key, 0) + change
+        if count:
+            counter[key] = count
+        else:
+            del counter[key]
+
+    def add(self, contact_id, contact):
+        """
+        Count a contact that was inserted or re-indexed.
+
+        Args:
+            contact_id (str): The contact ID
+            contact (dict): The contact data
+        """
+        category = contact.get('category', '')
+        address = contact.get('address')
+        state = address.get('state', '') if address else ''
+        phone = contact.get('phone', '')
+        area_code = phone.split('-')[0] if phone else None
+        missing_email = not contact.get('email')
+        
+        self.total_contacts += 1
+        self.contacts_without_email += missing_email
+        # Adding never empties a counter, so no _count() needed here
+        counter = self.contacts_by_category
+        counter[category] = counter.get(category, 0) + 1
+        if state:
+            counter = self.contacts_by_state
+            counter[state] = counter.get(state, 0) + 1
+        if area_code is not None:
+            counter = self.area_codes
+            count = counter[area_code] = counter.get(area_code, 0) + 1
+            most_common = self._most_common_area_code
+            if most_common is not None and area_code != most_common:
+                most_common_count = counter[most_common]
+                if count > most_common_count:
+                    self._most_common_area_code = area_code
+                elif count == most_common_count:
+                    # A tie goes to the code counted first, look again
+                    self._most_common_area_code = None
+        self._contributions[contact_id] = (category, state, area_code, missing_email)
+
+    def remove(self, contact_id):
+        """
+        Stop counting a contact, using the values it was counted with.
+
+        Args:
+            contact_id (str): The contact ID
+        """
+        contribution = self._contributions.pop(contact_id, None)
+        if contribution is None:
+            return
+        category, state, area_code, missing_email = contribution
+        
+        self.total_contacts -= 1
+        self.contacts_without_email -= missing_email
+        self._count(self.contacts_by_category, category, -1)
+        if state:
+            self._count(self.contacts_by_state, state, -1)
+        if area_code is not None:
+            self._count(self.area_codes, area_code, -1)
+            if area_code == self._most_common_area_code:
+                self._most_common_area_code = None
+
+    def clear(self):
+        self.__init__()
+
+    def snapshot(self):
+        """
+        Returns:
+            dict: Statistics in the format of generate_contact_statistics()
+        """
+        stats = {
+            'total_contacts': self.total_contacts,
+            'contacts_by_category': dict(self.contacts_by_category),
+            'contacts_by_state': dict(self.contacts_by_state),
+            'contacts_without_email': self.contacts_without_email,
+            'area_codes': defaultdict(int, self.area_codes),
+        }
+        
+        if self.contacts_by_category:
+            stats['average_contacts_per_category'] = (
+                self.total_contacts / len(self.contacts_by_category))
+        else:
+            stats['average_contacts_per_category'] = 0
+        
+        if self.area_codes:
+            if self._most_common_area_code is None:
+                self._most_common_area_code = max(
+                    self.area_codes.items(), key=lambda x: x[1])[0]
+            stats['most_common_area_code'] = self._most_common_area_code
+        else:
+            stats['most_common_area_code'] = 'N/A'
+        
+        return stats
+
+class ContactDatabase(dict):
+    """
+    Contacts database (contact_id -> contact dict) with hash indexes.
+
+    Behaves like the plain dict used everywhere in this module, but keeps
+    phone, email, category and name indexes up to date on every insert and
+    delete, so exact-match lookups are O(1) instead of a full scan.
+    Contacts edited in place must be passed to reindex().
+
+    Each index bucket is an insertion-ordered dict of contact IDs, kept in
+    database order so results can be streamed without sorting; a bucket
+    that a re-indexed contact joined out of order is re-sorted on its
+    next read. A bucket of one contact (most phone and email buckets) is
+    stored as the bare contact ID; read buckets through bucket().
+
+    Like a dict it is not thread-safe: besides that re-sorting, searches
+    may patch the sorted name lists or build the name n-gram index. Call
+    update_lazy_indexes() after changes to let concurrent readers in
+    (ContactStore does this under its write lock).
+    
+    It also owns the ID allocator used by generate_contact_id(), the
+    running counters used by generate_contact_statistics() and, when
+    opened through open_journaled_contacts(), the journal that logs every
+    change.
+    """
+    INDEXED_FIELDS = ('phone', 'email', 'category', 'name')
+
+    def __init__(self, *args, **kwargs):
+        super().__init__()
+        self.id_allocator = ContactIdAllocator()
+        self.journal = None
+        self.statistics = ContactStatistics()
+        self.indexes = {field: {} for field in self.INDEXED_FIELDS}
+        # Every 1-3 character substring of a name -> name length -> names,
+        # built by the first substring search and kept up to date after that
+        self.name_grams = None
+        # Name length -> sorted names of that length, brought up to date
+        # from the pending sets by names_by_length()
+        self._names_by_length = {}
+        self._names_added = set()
+        self._names_removed = set()
+        # (field, key) of buckets no longer in database order
+        self._unordered_buckets = set()
+        self._index_keys = {}
+        self._order = {}
+        self._next_order = 0
+        self.update(*args, **kwargs)
+
+    # Index each slot of _keys_for() belongs to
+    _KEY_FIELDS = ('phone', 'email', 'category', 'name', 'name')
+
+    @staticmethod
+    def _keys_for(contact):
+        """Return the index keys of a contact, one per _KEY_FIELDS slot."""
+        return (
+            contact.get('phone', ''),
+            contact.get('email', ''),
+            contact.get('category', '').lower(),
+            contact.get('first_name', '').lower(),
+            contact.get('last_name', '').lower(),
+        )
+
+    def _add_to_bucket(self, field, value, contact_id):
+        index = self.indexes[field]
+        bucket = index.get(value)
+        if bucket is None:
+            index[value] = contact_id
+            if field == 'name':
+                self._add_name_grams(value)
+        elif type(bucket) is dict:
+            bucket[contact_id] = None
+        else:
+            index[value] = {bucket: None, contact_id: None}
+
+    def _remove_from_bucket(self, field, value, contact_id):
+        bucket = self.indexes[field].get(value)
+        if bucket is None:
+            return
+        if type(bucket) is dict:
+            bucket.pop(contact_id, None)
+            if bucket:
+                return
+        elif bucket != contact_id:
+            return
+        del self.indexes[field][value]
+        self._unordered_buckets.discard((field, value))
+        if field == 'name':
+            self._remove_name_grams(value)
+
+    def _index(self, contact_id, contact):
+        # New contacts come last in database order, so buckets stay sorted
+        keys = self._keys_for(contact)
+        for field, value in zip(self._KEY_FIELDS, keys):
+            self._add_to_bucket(field, value, contact_id)
+        self._index_keys[contact_id] = keys
+        self.statistics.add(contact_id, contact)
+
+    def _unindex(self, contact_id):
+        keys = self._index_keys.pop(contact_id, ())
+        for field, value in zip(self._KEY_FIELDS, keys):
+            self._remove_from_bucket(field, value, contact_id)
+        self.statistics.remove(contact_id)
+
+    def _reindex(self, contact_id, contact):
+        """Move an existing contact to the buckets of its new keys."""
+        old_keys = set(zip(self._KEY_FIELDS, self._index_keys[contact_id]))
+        keys = self._keys_for(contact)
+        new_keys = set(zip(self._KEY_FIELDS, keys))
+        for field, value in old_keys - new_keys:
+            self._remove_from_bucket(field, value, contact_id)
+        
+        order = self._order[contact_id]
+        for field, value in new_keys - old_keys:
+            bucket = self.indexes[field].get(value)
+            if bucket is not None:
+                last = next(reversed(bucket)) if type(bucket) is dict else bucket
+                if self._order[last] > order:
+                    self._unordered_buckets.add((field, value))
+            self._add_to_bucket(field, value, contact_id)
+        
+        self._index_keys[contact_id] = keys
+        self.statistics.remove(contact_id)
+        self.statistics.add(contact_id, contact)
+
+    def bucket(self, field, key):
+        """
+        The contact IDs of one index bucket, in database order.
+
+        Args:
+            field (str): One of INDEXED_FIELDS
+            key (str): Value to look up (lowercase for category and name)
+
+        Returns:
+            dict: contact_id -> None, usually the index's own bucket; must
+            not be modified, and the database must not change while
+            iterating it
+        """
+        index = self.indexes[field]
+        bucket = index.get(key)
+        if bucket is None:
+            return {}
+        if type(bucket) is not dict:
+            return {bucket: None}
+        if (field, key) in self._unordered_buckets:
+            # A new dict, so readers iterating the old one are safe
+            bucket = index[key] = dict.fromkeys(sorted(bucket, key=self._order.__getitem__))
+            self._unordered_buckets.discard((field, key))
+        return bucket
+
+    @staticmethod
+    def _grams(name):
+        return {name[start:start + size]
+                for size in (1, 2, 3) for start in range(len(name) - size + 1)}
+
+    @classmethod
+    def _insert_name_grams(cls, name_grams, name):
+        for gram in cls._grams(name):
+            by_length = name_grams.get(gram)
+            if by_length is None:
+                name_grams[gram] = {len(name): {name}}
+            else:
+                names = by_length.get(len(name))
+                if names is None:
+                    by_length[len(name)] = {name}
+                else:
+                    names.add(name)
+
+    def _add_name_grams(self, name):
+        if name in self._names_removed:
+            self._names_removed.discard(name)
+        else:
+            self._names_added.add(name)
+        if self.name_grams is not None:
+            self._insert_name_grams(self.name_grams, name)
+
+    def _remove_name_grams(self, name):
+        if name in self._names_added:
+            self._names_added.discard(name)
+        else:
+            self._names_removed.add(name)
+        if self.name_grams is None:
+            return
+        for gram in self._grams(name):
+            by_length = self.name_grams[gram]
+            names = by_length[len(name)]
+            names.discard(name)
+            if not names:
+                del by_length[len(name)]
+                if not by_length:
+                    del self.name_grams[gram]
+
+    def _build_name_grams(self):
+        name_grams = {}
+        for name in self.indexes['name']:
+            self._insert_name_grams(name_grams, name)
+        self.name_grams = name_grams
+        return name_grams
+
+    def names_containing(self, search_term):
+        """
+        Find the distinct lowercase first/last names containing a substring.
+
+        Terms of up to three characters are answered straight from the
+        n-gram index; longer terms intersect the sets of their trigrams and
+        only check the few names left.
+
+        Args:
+            search_term (str): Lowercase substring to look for
+
+        Returns:
+            set: Matching names (keys of indexes['name'])
+        """
+        if not search_term:
+            return set(self.indexes['name'])
+        return set().union(*self.names_containing_by_length(search_term).values())
+
+    def names_containing_by_length(self, search_term):
+        """
+        Like names_containing(), with the names grouped by length.
+
+        Args:
+            search_term (str): Non-empty lowercase substring to look for
+
+        Returns:
+            dict: length -> set of matching names. For terms of up to
+            three characters this is the n-gram index itself, not a copy,
+            so it must not be modified.
+        """
+        name_grams = self.name_grams
+        if name_grams is None:
+            name_grams = self._build_name_grams()
+        if len(search_term) <= 3:
+            return name_grams.get(search_term, {})
+        
+        trigrams = {search_term[start:start + 3] for start in range(len(search_term) - 2)}
+        by_length = [name_grams.get(gram) for gram in trigrams]
+        if not all(by_length):
+            return {}
+        matches = {}
+        for length in min(by_length, key=len):
+            if length < len(search_term):
+                continue
+            candidates = [groups.get(length) for groups in by_length]
+            if not all(candidates):
+                continue
+            candidates.sort(key=len)
+            names = {name for name in candidates[0].intersection(*candidates[1:])
+                     if search_term in name}
+            if names:
+                matches[length] = names
+        return matches
+
+    def names_by_length(self):
+        """
+        Distinct lowercase names grouped by length, each group sorted, so
+        prefix matches can be found with bisect.
+
+        Names added or removed since the last call are patched in (or the
+        groups rebuilt after large batches) into new lists, so callers
+        holding the previous groups are not affected.
+
+        Returns:
+            dict: length -> sorted list of names; must not be modified
+        """
+        added, removed = self._names_added, self._names_removed
+        if not added and not removed:
+            return self._names_by_length
+        
+        if len(added) + len(removed) > NAME_ORDER_REBUILD:
+            groups = defaultdict(list)
+            for name in self.indexes['name']:
+                groups[len(name)].append(name)
+            for names in groups.values():
+                names.sort()
+            groups = dict(groups)
+        else:
+            groups = dict(self._names_by_length)
+            changed = {}
+            for name in removed:
+                names = changed.get(len(name))
+                if names is None:
+                    names = changed[len(name)] = list(groups[len(name)])
+                del names[bisect.bisect_left(names, name)]
+            for name in added:
+                names = changed.get(len(name))
+                if names is None:
+                    names = changed[len(name)] = list(groups.get(len(name), ()))
+                bisect.insort(names, name)
+            for length, names in changed.items():
+                if names:
+                    groups[length] = names
+                else:
+                    del groups[length]
+        
+        self._names_by_length = groups
+        added.clear()
+        removed.clear()
+        return groups
+
+    def update_lazy_indexes(self):
+        """
+        Do the index work that reads otherwise do on demand: re-sort the
+        buckets left out of database order, patch the sorted name lists
+        and build the name n-gram index. Until the next change, reads then
+        leave the database untouched and may run concurrently.
+        """
+        for field, key in list(self._unordered_buckets):
+            self.bucket(field, key)
+        self.names_by_length()
+        if self.name_grams is None:
+            self._build_name_grams()
+
+    def __setitem__(self, contact_id, contact):
+        if contact_id in self:
+            super().__setitem__(contact_id, contact)
+            self._reindex(contact_id, contact)
+        else:
+            self._order[contact_id] = self._next_order
+            self._next_order += 1
+            self.id_allocator.observe(contact_id)
+            super().__setitem__(contact_id, contact)
+            self._index(contact_id, contact)
+        if self.journal is not None:
+            self.journal.record('set', contact_id, contact)
+
+    def __delitem__(self, contact_id):
+        super().__delitem__(contact_id)
+        self._unindex(contact_id)
+        del self._order[contact_id]
+        if self.journal is not None:
+            self.journal.record('delete', contact_id)
+
+    def pop(self, contact_id, *default):
+        if contact_id not in self:
+            return super().pop(contact_id, *default)
+        contact = self[contact_id]
+        del self[contact_id]
+        return contact
+
+    def popitem(self):
+        contact_id, contact = super().popitem()
+        self._unindex(contact_id)
+        del self._order[contact_id]
+        if self.journal is not None:
+            self.journal.record('delete', contact_id)
+        return contact_id, contact
+
+    def add_many(self, items):
+        """
+        Insert a batch of new (contact_id, contact) pairs.
+
+        Skips the per-item bookkeeping of __setitem__; every contact ID in
+        the batch must be new to the database.
+
+        Args:
+            items (iterable): (contact_id, contact) pairs
+        """
+        order = self._next_order
+        observe = self.id_allocator.observe
+        count = self.statistics.add
+        keys_for = self._keys_for
+        # _index() inlined, with the bucket lookups done here
+        indexes = [self.indexes[field] for field in self._KEY_FIELDS]
+        names = self.indexes['name']
+        for contact_id, contact in items:
+            dict.__setitem__(self, contact_id, contact)
+            self._order[contact_id] = order
+            order += 1
+            observe(contact_id)
+            keys = keys_for(contact)
+            for index, value in zip(indexes, keys):
+                bucket = index.get(value)
+                if bucket is None:
+                    index[value] = contact_id
+                    if index is names:
+                        self._add_name_grams(value)
+                elif type(bucket) is dict:
+                    bucket[contact_id] = None
+                else:
+                    index[value] = {bucket: None, contact_id: None}
+            self._index_keys[contact_id] = keys
+            count(contact_id, contact)
+            if self.journal is not None:
+                self.journal.record('set', contact_id, contact)
+        self._next_order = order
+
+    def setdefault(self, contact_id, default=None):
+        if contact_id not in self:
+            self[contact_id] = default
+        return self[contact_id]
+
+    def update(self, *args, **kwargs):
+        contacts = dict(*args, **kwargs)
+        if not self:
+            self.add_many(contacts.items())
+            return
+        for contact_id, contact in contacts.items():
+            self[contact_id] = contact
+
+    def clear(self):
+        super().clear()
+        for index in self.indexes.values():
+            index.clear()
+        self.name_grams = None
+        self._names_by_length = {}
+        self._names_added.clear()
+        self._names_removed.clear()
+        self._unordered_buckets.clear()
+        self._index_keys.clear()
+        self._order.clear()
+        self.statistics.clear()
+        if self.journal is not None:
+            self.journal.record('clear')
+
+    def reindex(self, contact_id):
+        """
+        Refresh the index (and journal) entries of a contact that was
+        modified in place.
+
+        Args:
+            contact_id (str): Contact whose fields changed
+        """
+        self._reindex(contact_id, self[contact_id])
+        if self.journal is not None:
+            self.journal.record('set', contact_id, self[contact_id])
+
+    def lookup(self, field, key):
+        """
+        Exact-match lookup through one of the indexes.
+
+        Args:
+            field (str): One of INDEXED_FIELDS
+            key (str): Value to look up (lowercase for category and name)
+
+        Returns:
+            list: Matching contact IDs in database order
+        """
+        return list(self.bucket(field, key))
+
+    def _in_db_order(self, contact_ids):
+        return sorted(contact_ids, key=self._order.__getitem__)
+
+    # Copies and pickles hold only the contacts and the allocator position;
+    # indexes and statistics are rebuilt for them, and they are not journaled
+
+    def __copy__(self):
+        duplicate = self.__class__(dict(self))
+        duplicate.__setstate__(self.__getstate__())
+        return duplicate
+
+    def __deepcopy__(self, memo):
+        duplicate = self.__class__()
+        memo[id(self)] = duplicate
+        duplicate.update(copy.deepcopy(dict(self), memo))
+        duplicate.__setstate__(self.__getstate__())
+        return duplicate
+
+    def __reduce__(self):
+        return (self.__class__, (dict(self),), self.__getstate__())
+
+    def __getstate__(self):
+        return {'next_contact_number': self.id_allocator.next_number}
+
+    def __setstate__(self, state):
+        self.id_allocator.next_number = max(self.id_allocator.next_number,
+                                            state['next_contact_number'])
 
 # Contact database structure
-contacts_db = {}
+contacts_db = ContactDatabase()
 
 def create_contact():
     """
@@ -89,8 +951,7 @@ def validate_phone(phone):
     Returns:
         bool: True if valid, False otherwise
     """
-    pattern = r'^\d{3}-\d{3}-\d{4}$'
-    return re.match(pattern, phone) is not None
+    return validators.validate('contact_phone', phone)
 
 def validate_email(email):
     """
@@ -102,8 +963,7 @@ def validate_email(email):
     Returns:
         bool: True if valid format, False otherwise
     """
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(pattern, email) is not None
+    return validators.validate('contact_email', email)
 
 def generate_contact_id(contacts_db):
     """
@@ -115,6 +975,9 @@ def generate_contact_id(contacts_db):
     Returns:
         str: A unique contact ID
     """
+    if isinstance(contacts_db, ContactDatabase):
+        return contacts_db.id_allocator.allocate()
+    
     if not contacts_db:
         return 'contact_001'
     
@@ -123,6 +986,25 @@ def generate_contact_id(contacts_db):
     max_num = int(max_id.split('_')[1])
     return f'contact_{max_num + 1:03d}'
 
+def reserve_contact_ids(contacts_db, count):
+    """
+    Reserve a block of unique contact IDs for a batch insert.
+    
+    Args:
+        contacts_db (dict): The contacts database
+        count (int): Number of IDs needed
+        
+    Returns:
+        list: The reserved contact IDs
+    """
+    if isinstance(contacts_db, ContactDatabase):
+        return contacts_db.id_allocator.reserve(count)
+    
+    allocator = ContactIdAllocator()
+    for contact_id in contacts_db:
+        allocator.observe(contact_id)
+    return allocator.reserve(count)
+
 def add_contact(contacts_db, contact_data):
     """
     Add a new contact to the database.
@@ -141,6 +1023,59 @@ def add_contact(contacts_db, contact_data):
     contacts_db[contact_id] = contact_data
     return contact_id
 
+def add_contacts_bulk(contacts_db, contacts):
+    """
+    Validate and add many contacts in one batch.
+    
+    Rows need a first name, last name and a valid phone number, like in
+    create_contact(). Accepted rows are copied, so the caller's dicts are
+    left untouched, and missing optional fields are filled with the same
+    defaults create_contact() uses. IDs are reserved in a single block.
+    
+    Args:
+        contacts_db (dict): The main contacts database
+        contacts (iterable): Contact dictionaries to add
+        
+    Returns:
+        dict: Report with:
+        - added: list of new contact IDs, in input order
+        - rejected: list of (row_number, reason) tuples
+    """
+    today = datetime.datetime.now().strftime("%Y-%m-%d")
+    phone_match = validators.pattern('contact_phone').match
+    valid_rows = []
+    rejected = []
+    
+    for row_number, contact in enumerate(contacts):
+        if not contact:
+            rejected.append((row_number, 'empty row'))
+            continue
+        if not contact.get('first_name') or not contact.get('last_name'):
+            rejected.append((row_number, 'missing name'))
+            continue
+        if phone_match(contact.get('phone', '')) is None:
+            rejected.append((row_number, 'invalid phone'))
+            continue
+        
+        contact = dict(contact)
+        if isinstance(contact.get('address'), dict):
+            contact['address'] = dict(contact['address'])
+        contact.setdefault('email', '')
+        contact.setdefault('address', {})
+        contact.setdefault('category', 'personal')
+        contact.setdefault('notes', '')
+        contact.setdefault('created_date', today)
+        contact.setdefault('last_modified', contact['created_date'])
+        valid_rows.append(contact)
+    
+    contact_ids = reserve_contact_ids(contacts_db, len(valid_rows))
+    if isinstance(contacts_db, ContactDatabase):
+        contacts_db.add_many(zip(contact_ids, valid_rows))
+    else:
+        contacts_db.update(zip(contact_ids, valid_rows))
+    
+    return {'added': contact_ids, 'rejected': rejected}
+
 def display_contact(contacts_db, contact_id):
     """
     Display a formatted view of a single contact.
@@ -213,6 +1148,14 @@ def search_contacts_by_name(contacts_db, search_term):
     results = {}
     search_term = search_term.lower()
     
+    if isinstance(contacts_db, ContactDatabase):
+        matches = set()
+        for name in contacts_db.names_containing(search_term):
+            matches.update(contacts_db.bucket('name', name))
+        for contact_id in contacts_db._in_db_order(matches):
+            results[contact_id] = contacts_db[contact_id]
+        return results
+    
     for contact_id, contact in contacts_db.items():
         first_name = contact['first_name'].lower()
         last_name = contact['last_name'].lower()
@@ -222,6 +1165,126 @@ def search_contacts_by_name(contacts_db, search_term):
             
     return results
 
+def search_contacts_ranked(contacts_db, search_term, limit=10):
+    """
+    Type-ahead name search returning the best matches first.
+    
+    Contacts whose first or last name equals the term come first, then
+    names starting with it, then names containing it; ties go to the
+    shorter name and then to database order.
+    
+    Args:
+        contacts_db (dict): The main contacts database
+        search_term (str): Partial name to search for
+        limit (int): Maximum number of results (None for all)
+        
+    Returns:
+        dict: Up to limit matching contacts, best match first
+    """
+    search_term = search_term.lower()
+    
+    def rank(name):
+        if name == search_term:
+            return 0
+        if name.startswith(search_term):
+            return 1
+        return 2
+    
+    if isinstance(contacts_db, ContactDatabase):
+        if limit is not None and limit <= 0:
+            return {}
+        order = contacts_db._order.__getitem__
+        ranked = []
+        seen = set()
+        
+        # Walk the matching names best first, one (rank, length) group at
+        # a time, and stop as soon as limit contacts are collected; a
+        # contact is ranked by the first (best) of its names seen
+        for names in _ranked_name_groups(contacts_db, search_term):
+            if limit is None:
+                contact_ids = set()
+                for name in names:
+                    contact_ids.update(contacts_db.bucket('name', name))
+                contact_ids -= seen
+                ranked.extend(sorted(contact_ids, key=order))
+                seen.update(contact_ids)
+                continue
+            
+            # Buckets are in database order, so merging them yields the
+            # group's contacts in order and only the first few are read
+            buckets = [contacts_db.bucket('name', name) for name in names]
+            merged = buckets[0] if len(buckets) == 1 else heapq.merge(*buckets, key=order)
+            for contact_id in merged:
+                if contact_id not in seen:
+                    seen.add(contact_id)
+                    ranked.append(contact_id)
+                    if len(ranked) >= limit:
+                        break
+            if len(ranked) >= limit:
+                break
+        return {contact_id: contacts_db[contact_id] for contact_id in ranked}
+    
+    best = {}
+    positions = {}
+    for contact_id, contact in contacts_db.items():
+        positions[contact_id] = len(positions)
+        for name in (contact['first_name'].lower(), contact['last_name'].lower()):
+            if search_term in name:
+                key = (rank(name), len(name))
+                if contact_id not in best or key < best[contact_id]:
+                    best[contact_id] = key
+    
+    def sort_key(contact_id):
+        return best[contact_id], positions[contact_id]
+    
+    if limit is None:
+        ranked = sorted(best, key=sort_key)
+    else:
+        ranked = heapq.nsmallest(limit, best, key=sort_key)
+    return {contact_id: contacts_db[contact_id] for contact_id in ranked}
+
+def _ranked_name_groups(contacts_db, search_term):
+    """
+    Yield the indexed names matching search_term, best rank first.
+    
+    Each group holds the names sharing one search_contacts_ranked() key:
+    the exact name, then names starting with the term from the shortest
+    up, then names only containing it from the shortest up. Exact and
+    prefix matches come from the sorted name lists by bisect, so nothing
+    past the groups actually consumed is looked at.
+    
+    Args:
+        contacts_db (ContactDatabase): The indexed database
+        search_term (str): Lowercase search term
+        
+    Yields:
+        list: Names (keys of indexes['name']) of one rank and length
+    """
+    if search_term in contacts_db.indexes['name']:
+        yield [search_term]
+    
+    names_by_length = contacts_db.names_by_length()
+    for length in sorted(names_by_length):
+        if length <= len(search_term):
+            continue
+        names = names_by_length[length]
+        start = bisect.bisect_left(names, search_term)
+        end = start
+        while end < len(names) and names[end].startswith(search_term):
+            end += 1
+        if end > start:
+            yield names[start:end]
+    
+    if not search_term:
+        return
+    containing = contacts_db.names_containing_by_length(search_term)
+    for length in sorted(containing):
+        if length <= len(search_term):
+            continue
+        names = [name for name in containing[length] if not name.startswith(search_term)]
+        if names:
+            yield names
+
 def search_contacts_by_category(contacts_db, category):
     """
     Find all contacts in a specific category.
@@ -236,6 +1299,11 @@ def search_contacts_by_category(contacts_db, category):
     results = {}
     category = category.lower()
     
+    if isinstance(contacts_db, ContactDatabase):
+        for contact_id in contacts_db.lookup('category', category):
+            results[contact_id] = contacts_db[contact_id]
+        return results
+    
     for contact_id, contact in contacts_db.items():
         if contact['category'].lower() == category:
             results[contact_id] = contact
@@ -253,12 +1321,47 @@ def find_contact_by_phone(contacts_db, phone_number):
     Returns:
         tuple: (contact_id, contact_data) if found, (None, None) if not found
     """
+    if isinstance(contacts_db, ContactDatabase):
+        matches = contacts_db.lookup('phone', phone_number)
+        if matches:
+            return (matches[0], contacts_db[matches[0]])
+        return (None, None)
+    
+    if isinstance(contacts_db, MappedContactDatabase):
+        return next(contacts_db.find_by_field('phone', phone_number), (None, None))
+    
     for contact_id, contact in contacts_db.items():
         if contact['phone'] == phone_number:
             return (contact_id, contact)
             
     return (None, None)
 
+def find_contact_by_email(contacts_db, email):
+    """
+    Find contact by email address (exact match).
+    
+    Args:
+        contacts_db (dict): The main contacts database
+        email (str): Email address to search for
+        
+    Returns:
+        tuple: (contact_id, contact_data) if found, (None, None) if not found
+    """
+    if isinstance(contacts_db, ContactDatabase):
+        matches = contacts_db.lookup('email', email)
+        if matches:
+            return (matches[0], contacts_db[matches[0]])
+        return (None, None)
+    
+    if isinstance(contacts_db, MappedContactDatabase):
+        return next(contacts_db.find_by_field('email', email), (None, None))
+    
+    for contact_id, contact in contacts_db.items():
+        if contact['email'] == email:
+            return (contact_id, contact)
+            
+    return (None, None)
+
 def update_contact(contacts_db, contact_id, field_updates):
     """
     Update specific fields of an existing contact.
@@ -285,20 +1388,32 @@ def update_contact(contacts_db, contact_id, field_updates):
     if 'email' in field_updates and field_updates['email'] and not validate_email(field_updates['email']):
         print("Warning: Email format appears invalid. Continuing anyway.")
     
+    # Compact records are read-only: edit a dict copy and compact it again
+    contact = contacts_db[contact_id]
+    is_compact = isinstance(contact, CompactContact)
+    if is_compact:
+        contact = contact.to_dict()
+    
     # Update the fields
     for field, value in field_updates.items():
         if field == 'address':
             # Handle address updates
-            if 'address' not in contacts_db[contact_id]:
-                contacts_db[contact_id]['address'] = {}
+            if 'address' not in contact:
+                contact['address'] = {}
                 
             for addr_field, addr_value in value.items():
-                contacts_db[contact_id]['address'][addr_field] = addr_value
+                contact['address'][addr_field] = addr_value
         else:
-            contacts_db[contact_id][field] = value
+            contact[field] = value
     
     # Update last modified timestamp
-    contacts_db[contact_id]['last_modified'] = datetime.datetime.now().strftime("%Y-%m-%d")
+    contact['last_modified'] = datetime.datetime.now().strftime("%Y-%m-%d")
+    
+    if is_compact:
+        contacts_db[contact_id] = compact_contact(contact)
+    elif isinstance(contacts_db, ContactDatabase):
+        # Keep the lookup indexes in sync with the edited fields
+        contacts_db.reindex(contact_id)
     
     return True
 
@@ -417,41 +1532,208 @@ def merge_contacts(contacts_db, contact_id1, contact_id2):
     print(f"Contacts merged successfully. New contact ID: {new_contact_id}")
     return new_contact_id
 
-def generate_contact_statistics(contacts_db):
+def merge_rule_prefer_first(field, candidates):
+    """Merge rule: keep the value of the first contact in the group."""
+    return candidates[0]
+
+def merge_rule_non_empty(field, candidates):
+    """Merge rule: keep the first non-empty value in group order."""
+    for candidate in candidates:
+        if candidate[2]:
+            return candidate
+    return candidates[0]
+
+def merge_rule_newest(field, candidates):
+    """Merge rule: keep the value of the most recently modified contact."""
+    return max(candidates, key=lambda candidate: candidate[1].get('last_modified', ''))
+
+MERGE_RULES = {
+    'prefer_first': merge_rule_prefer_first,
+    'non_empty': merge_rule_non_empty,
+    'newest': merge_rule_newest,
+}
+
+def merge_contact_groups(contacts_db, groups, rule='non_empty'):
     """
-    Generate comprehensive statistics about the contact database.
+    Merge groups of duplicate contacts without prompting.
+    
+    Follows merge_contacts(): dates keep the most recent value and an
+    address field that is empty in one contact takes the other's value.
+    Any other conflict is settled by the merge rule, a function taking
+    (field, candidates) where candidates is a list of
+    (contact_id, contact, value) tuples and returning the chosen tuple.
+    Groups that share a contact are merged together.
     
     Args:
         contacts_db (dict): The main contacts database
+        groups (list or dict): Lists of contact IDs, or the result of
+            find_duplicate_contacts() / find_fuzzy_duplicate_contacts()
+        rule (str or callable): A name from MERGE_RULES or a rule function
         
     Returns:
-        dict: Statistics including:
-        - total_contacts: int
-        - contacts_by_category: dict
-        - contacts_by_state: dict (from address)
-        - average_contacts_per_category: float
-        - most_common_area_code: str
-        - contacts_without_email: int
+        dict: Report with:
+        - merged: dict of new contact ID -> list of merged contact IDs
+        - audit: list of dicts recording every conflict and its winner
     """
-    stats = {
-        'total_contacts': len(contacts_db),
-        'contacts_by_category': defaultdict(int),
-        'contacts_by_state': defaultdict(int),
-        'contacts_without_email': 0,
-        'area_codes': defaultdict(int)
-    }
+    if isinstance(groups, dict):
+        groups = [group for dup_groups in groups.values() for group in dup_groups]
+    if not callable(rule):
+        rule = MERGE_RULES[rule]
     
-    # Count contacts by category and state
-    for contact in contacts_db.values():
-        stats['contacts_by_category'][contact['category']] += 1
+    # Union overlapping groups so every contact is merged only once
+    parents = {}
+    
+    def find(contact_id):
+        while parents[contact_id] != contact_id:
+            parents[contact_id] = parents[parents[contact_id]]
+            contact_id = parents[contact_id]
+        return contact_id
+    
+    for group in groups:
+        members = [contact_id for contact_id in group if contact_id in contacts_db]
+        for contact_id in members:
+            parents.setdefault(contact_id, contact_id)
+        for contact_id in members[1:]:
+            parents[find(contact_id)] = find(members[0])
+    
+    clusters = defaultdict(list)
+    for contact_id in parents:
+        clusters[find(contact_id)].append(contact_id)
+    clusters = [members for members in clusters.values() if len(members) > 1]
+    
+    new_ids = reserve_contact_ids(contacts_db, len(clusters))
+    merged = {}
+    audit = []
+    new_contacts = []
+    
+    for new_id, members in zip(new_ids, clusters):
+        contacts = [(contact_id, contacts_db[contact_id]) for contact_id in members]
+        merged_contact = {}
         
-        # Count contacts without email
-        if not contact['email']:
-            stats['contacts_without_email'] += 1
+        fields = []
+        for _, contact in contacts:
+            fields.extend(field for field in contact if field not in fields)
+        
+        for field in fields:
+            candidates = [(contact_id, contact, contact[field])
+                          for contact_id, contact in contacts if field in contact]
             
-        # Extract area code from phone
-        if contact['phone']:
-            area_code = contact['phone'].split('-')[0]
+            if field == 'address':
+                merged_contact[field] = _merge_address_field(
+                    new_id, candidates, rule, audit)
+                continue
+            
+            if all(candidate[2] == candidates[0][2] for candidate in candidates):
+                merged_contact[field] = candidates[0][2]
+                continue
+            
+            if field in ['created_date', 'last_modified']:
+                # For dates, keep the most recent
+                chosen = max(candidates, key=lambda candidate: candidate[2])
+            else:
+                chosen = rule(field, candidates)
+            merged_contact[field] = chosen[2]
+            audit.append({
+                'merged_into': new_id,
+                'field': field,
+                'chosen_from': chosen[0],
+                'value': chosen[2],
+                'candidates': {candidate[0]: candidate[2] for candidate in candidates},
+            })
+        
+        merged[new_id] = members
+        new_contacts.append((new_id, merged_contact))
+    
+    # Apply every change in one pass over the database
+    for members in clusters:
+        for contact_id in members:
+            del contacts_db[contact_id]
+    if isinstance(contacts_db, ContactDatabase):
+        contacts_db.add_many(new_contacts)
+    else:
+        contacts_db.update(new_contacts)
+    
+    return {'merged': merged, 'audit': audit}
+
+def _merge_address_field(new_id, candidates, rule, audit):
+    """
+    Merge the address dictionaries of a group field by field.
+    
+    Args:
+        new_id (str): ID of the merged contact, for the audit log
+        candidates (list): (contact_id, contact, address) tuples
+        rule (callable): Merge rule for conflicting values
+        audit (list): Audit log to append conflicts to
+        
+    Returns:
+        dict: The merged address
+    """
+    merged_address = {}
+    addr_fields = []
+    for _, _, address in candidates:
+        addr_fields.extend(field for field in address if field not in addr_fields)
+    
+    for addr_field in addr_fields:
+        values = [(contact_id, contact, address[addr_field])
+                  for contact_id, contact, address in candidates if addr_field in address]
+        # Empty values lose to filled ones
+        filled = [value for value in values if value[2]] or values
+        if all(value[2] == filled[0][2] for value in filled):
+            merged_address[addr_field] = filled[0][2]
+            continue
+        
+        chosen = rule(f'address.{addr_field}', filled)
+        merged_address[addr_field] = chosen[2]
+        audit.append({
+            'merged_into': new_id,
+            'field': f'address.{addr_field}',
+            'chosen_from': chosen[0],
+            'value': chosen[2],
+            'candidates': {value[0]: value[2] for value in values},
+        })
+    return merged_address
+
+def generate_contact_statistics(contacts_db, rescan=False):
+    """
+    Generate comprehensive statistics about the contact database.
+    A ContactDatabase answers from its running counters unless rescan
+    is set.
+    
+    Args:
+        contacts_db (dict): The main contacts database
+        rescan (bool): Recount every contact instead of using the counters
+        
+    Returns:
+        dict: Statistics including:
+        - total_contacts: int
+        - contacts_by_category: dict
+        - contacts_by_state: dict (from address)
+        - average_contacts_per_category: float
+        - most_common_area_code: str
+        - contacts_without_email: int
+    """
+    if isinstance(contacts_db, ContactDatabase) and not rescan:
+        return contacts_db.statistics.snapshot()
+    
+    stats = {
+        'total_contacts': len(contacts_db),
+        'contacts_by_category': defaultdict(int),
+        'contacts_by_state': defaultdict(int),
+        'contacts_without_email': 0,
+        'area_codes': defaultdict(int)
+    }
+    
+    # Count contacts by category and state
+    for contact in contacts_db.values():
+        stats['contacts_by_category'][contact['category']] += 1
+        
+        # Count contacts without email
+        if not contact['email']:
+            stats['contacts_without_email'] += 1
+            
+        # Extract area code from phone
+        if contact['phone']:
+            area_code = contact['phone'].split('-')[0]
             stats['area_codes'][area_code] += 1
             
         # Count by state if address exists
@@ -478,6 +1760,26 @@ def generate_contact_statistics(contacts_db):
     
     return stats
 
+def verify_contact_statistics(contacts_db):
+    """
+    Check the running statistics of a ContactDatabase against a full rescan.
+    
+    Args:
+        contacts_db (ContactDatabase): The main contacts database
+        
+    Returns:
+        bool: True if the counters match the contacts
+    """
+    live = generate_contact_statistics(contacts_db)
+    rescanned = generate_contact_statistics(contacts_db, rescan=True)
+    keys = ['total_contacts', 'contacts_by_category', 'contacts_by_state',
+            'contacts_without_email', 'area_codes', 'average_contacts_per_category']
+    if any(live[key] != rescanned[key] for key in keys):
+        return False
+    # Ties may be broken differently, the count is what must agree
+    return (live['area_codes'].get(live['most_common_area_code'])
+            == rescanned['area_codes'].get(rescanned['most_common_area_code']))
+
 def find_duplicate_contacts(contacts_db):
     """
     Identify potential duplicate contacts based on:
@@ -521,6 +1823,386 @@ def find_duplicate_contacts(contacts_db):
     
     return result
 
+def soundex(name):
+    """
+    Phonetic code of a name, so that spellings like 'Jon' and 'John' match.
+    
+    Args:
+        name (str): Name to encode
+        
+    Returns:
+        str: Four character Soundex code, or '' if name has no letters
+    """
+    letters = NON_LETTERS.sub('', name.lower())
+    if not letters:
+        return ''
+    
+    digits = letters.translate(SOUNDEX_TABLE)
+    if not digits:
+        # Only 'h' and 'w'
+        return letters[0].upper() + '000'
+    
+    code = []
+    previous = letters[0].translate(SOUNDEX_TABLE)
+    for digit in digits[1:] if letters[0] not in 'hw' else digits:
+        if digit != previous and digit != '0':
+            code.append(digit)
+        previous = digit
+    return (letters[0].upper() + ''.join(code) + '000')[:4]
+
+def normalize_phone(phone):
+    """
+    Reduce a phone number to its last ten digits, ignoring formatting.
+    
+    Args:
+        phone (str): Phone number in any format
+        
+    Returns:
+        str: The digits, e.g. '1112223333' for '(111) 222-3333'
+    """
+    return NON_DIGITS.sub('', phone)[-10:]
+
+def find_fuzzy_duplicate_contacts(contacts_db, threshold=0.85, max_block_size=200):
+    """
+    Find likely duplicate contacts, including near-matches.
+    
+    Contacts are first split into blocks by cheap keys (normalised phone
+    digits, email local part, Soundex plus any digits of first and last
+    name) and only values inside the same block are compared, so the cost
+    stays close to linear instead of comparing every pair of contacts.
+    Blocks with more than max_block_size distinct values only compare
+    values that are close together in sorted order.
+    
+    Args:
+        contacts_db (dict): The main contacts database
+        threshold (float): Minimum edit_similarity() for two different
+            emails or names in the same block to count as duplicates
+        max_block_size (int): Largest block compared pair by pair
+        
+    Returns:
+        dict: Same shape as find_duplicate_contacts()
+    """
+    positions = {}
+    name_codes = {}
+    # Exact groups (value -> first contact ID, value -> every contact ID
+    # once it repeats) and blocks (key -> first distinct value, key -> every
+    # distinct value once there are two). Keeping single values as plain
+    # strings instead of one-item lists keeps these dicts out of the garbage
+    # collector's way, which dominates the run time on millions of contacts
+    phone_first, phone_more = {}, {}
+    email_first, email_more = {}, {}
+    name_first, name_more = {}, {}
+    email_block_first, email_block_more = {}, {}
+    name_block_first, name_block_more = {}, {}
+    
+    for position, (contact_id, contact) in enumerate(contacts_db.items()):
+        positions[contact_id] = position
+        
+        phone = normalize_phone(contact.get('phone', ''))
+        if phone:
+            _add_to_group(phone_first, phone_more, phone, contact_id)
+        
+        email = contact.get('email', '').strip().lower()
+        if email:
+            if email not in email_first:
+                local_part = email.split('@', 1)[0].split('+', 1)[0]
+                _add_to_group(email_block_first, email_block_more, local_part, email)
+            _add_to_group(email_first, email_more, email, contact_id)
+        
+        first_name = contact.get('first_name', '').strip().lower()
+        last_name = contact.get('last_name', '').strip().lower()
+        # Names repeat a lot, so each distinct name is only encoded once.
+        # Soundex ignores digits, which would put 'James12' and 'James13'
+        # (and every other numbered James) in one huge block
+        for name in (first_name, last_name):
+            if name not in name_codes:
+                name_codes[name] = soundex(name) + NON_DIGITS.sub('', name)
+        first_code = name_codes[first_name]
+        last_code = name_codes[last_name]
+        if first_code or last_code:
+            full_name = f"{first_name} {last_name}"
+            if full_name not in name_first:
+                _add_to_group(name_block_first, name_block_more,
+                              f"{first_code} {last_code}", full_name)
+            _add_to_group(name_first, name_more, full_name, contact_id)
+    
+    result = {
+        'phone_duplicates': list(phone_more.values()),
+        'email_duplicates': _cluster_similar_values(
+            email_block_more, email_first, email_more, threshold, max_block_size),
+        'name_duplicates': _cluster_similar_values(
+            name_block_more, name_first, name_more, threshold, max_block_size),
+    }
+    for dup_type, groups in result.items():
+        groups = [sorted(ids, key=positions.__getitem__) for ids in groups]
+        result[dup_type] = sorted(groups, key=lambda ids: positions[ids[0]])
+    return result
+
+def _add_to_group(first, more, key, value):
+    """Record value under key: the first one in first, all of them in more."""
+    seen = first.setdefault(key, value)
+    if seen is not value:
+        group = more.get(key)
+        if group is None:
+            more[key] = [seen, value]
+        else:
+            group.append(value)
+
+def edit_similarity(a, b, threshold=0.0):
+    """
+    Similarity of two strings from their Levenshtein distance.
+    
+    Only distances that can still reach threshold are computed (a band
+    around the diagonal), so clearly different strings are rejected after
+    a few characters.
+    
+    Args:
+        a (str): First string
+        b (str): Second string
+        threshold (float): Similarities below this are reported as 0.0
+        
+    Returns:
+        float: 1 - distance / length of the longer string, 1.0 if equal
+    """
+    if len(a) > len(b):
+        a, b = b, a
+    longer = len(b)
+    if not longer:
+        return 1.0
+    # Most edits the pair may need and still reach threshold
+    limit = min(longer, int((1 - threshold) * longer + 1e-9))
+    if longer - len(a) > limit:
+        return 0.0
+    
+    too_far = limit + 1
+    previous = [j if j <= limit else too_far for j in range(longer + 1)]
+    for i, char in enumerate(a, 1):
+        current = [too_far] * (longer + 1)
+        if i <= limit:
+            current[0] = i
+        best = current[0]
+        for j in range(max(1, i - limit), min(longer, i + limit) + 1):
+            distance = previous[j - 1] + (char != b[j - 1])
+            if previous[j] < distance:
+                distance = previous[j] + 1
+            if current[j - 1] < distance:
+                distance = current[j - 1] + 1
+            if distance > too_far:
+                distance = too_far
+            current[j] = distance
+            if distance < best:
+                best = distance
+        if best > limit:
+            return 0.0
+        previous = current
+    
+    if previous[longer] > limit:
+        return 0.0
+    return 1 - previous[longer] / longer
+
+def _cluster_similar_values(blocks, first_ids, more_ids, threshold, max_block_size):
+    """
+    Group contacts whose values are equal, or similar enough and in the
+    same block.
+    
+    Args:
+        blocks (dict): block key -> distinct values, for blocks with two
+            or more values
+        first_ids (dict): value -> first contact ID with that value
+        more_ids (dict): value -> contact IDs, for values shared by several
+        threshold (float): Minimum edit_similarity() to join two values
+        max_block_size (int): Largest block compared pair by pair
+        
+    Returns:
+        list: Lists of contact IDs with two or more members
+    """
+    groups = []
+    for distinct in blocks.values():
+        count = len(distinct)
+        parents = list(range(count))
+        # Sorted neighbourhood: huge blocks only compare nearby values
+        window = count
+        if count > max_block_size:
+            distinct = sorted(distinct)
+            window = max_block_size // 10 or 1
+        
+        def find(i):
+            while parents[i] != i:
+                parents[i] = parents[parents[i]]
+                i = parents[i]
+            return i
+        
+        for i in range(count - 1):
+            value = distinct[i]
+            for j in range(i + 1, min(i + 1 + window, count)):
+                other = distinct[j]
+                # Upper bound of the similarity from the lengths alone
+                shorter, longer = sorted((len(value), len(other)))
+                if shorter < threshold * longer:
+                    continue
+                if edit_similarity(value, other, threshold) >= threshold:
+                    parents[find(j)] = find(i)
+        
+        clusters = defaultdict(list)
+        for i, value in enumerate(distinct):
+            ids = more_ids.get(value)
+            if ids is None:
+                clusters[find(i)].append(first_ids[value])
+            else:
+                clusters[find(i)].extend(ids)
+        groups.extend(ids for ids in clusters.values() if len(ids) > 1)
+    
+    # Repeated values alone in their block are plain exact duplicates
+    compared = set()
+    for distinct in blocks.values():
+        compared.update(distinct)
+    groups.extend(ids for value, ids in more_ids.items() if value not in compared)
+    return groups
+
+EXPORT_CSV_COLUMNS = [
+    'contact_id', 'first_name', 'last_name', 'phone', 'email',
+    'street', 'city', 'state', 'zip_code',
+    'category', 'notes', 'created_date', 'last_modified'
+]
+
+def iter_contacts_in_category(contacts_db, category):
+    """
+    Yield the contacts of one category without building a result dict.
+    
+    Indexed databases are read straight from the category's index
+    bucket, so no list of the category's IDs is built either. The
+    database must not change while the iteration runs.
+    
+    Args:
+        contacts_db (dict): The main contacts database
+        category (str): Category to filter by (case-insensitive)
+        
+    Yields:
+        tuple: (contact_id, contact_data) in database order
+    """
+    category = category.lower()
+    if isinstance(contacts_db, ContactDatabase):
+        for contact_id in contacts_db.bucket('category', category):
+            yield contact_id, contacts_db[contact_id]
+        return
+    
+    for contact_id, contact in contacts_db.items():
+        if contact['category'].lower() == category:
+            yield contact_id, contact
+
+def format_contact_export(contact_id, contact):
+    """
+    Format one contact in the readable export layout.
+    
+    Args:
+        contact_id (str): Unique identifier for the contact
+        contact (dict): Contact information dictionary
+        
+    Returns:
+        str: The contact's block of the export, separator included
+    """
+    lines = [
+        f"Contact ID: {contact_id}\n",
+        f"Name: {contact['first_name']} {contact['last_name']}\n",
+        f"Phone: {contact['phone']}\n",
+        f"Email: {contact['email']}\n",
+    ]
+    
+    if contact['address']:
+        lines.append("Address:\n")
+        addr = contact['address']
+        if addr['street']:
+            lines.append(f"  Street: {addr['street']}\n")
+        if addr['city']:
+            lines.append(f"  City: {addr['city']}\n")
+        if addr['state']:
+            lines.append(f"  State: {addr['state']}\n")
+        if addr['zip_code']:
+            lines.append(f"  ZIP: {addr['zip_code']}\n")
+    
+    lines.append(f"Category: {contact['category']}\n")
+    if contact['notes']:
+        lines.append(f"Notes: {contact['notes']}\n")
+    
+    lines.append(f"Created: {contact['created_date']}\n")
+    lines.append(f"Last Modified: {contact['last_modified']}\n")
+    lines.append("-" * 40 + "\n\n")
+    return ''.join(lines)
+
+def iter_category_export(contacts_db, category, output_format='text'):
+    """
+    Export contacts from a specific category as a stream of text chunks.
+    Only one contact is formatted at a time, so memory stays constant no
+    matter how many contacts the category holds.
+    
+    Args:
+        contacts_db (dict): The main contacts database
+        category (str): Category to export
+        output_format (str): 'text' (same layout as
+            export_contacts_by_category), 'csv' or 'jsonl'
+        
+    Yields:
+        str: Consecutive pieces of the export
+    """
+    contacts = iter_contacts_in_category(contacts_db, category)
+    
+    if output_format == 'text':
+        first = next(contacts, None)
+        if first is None:
+            yield f"No contacts found in category '{category}'."
+            return
+        yield f"--- Contacts in Category: {category} ---\n\n"
+        yield format_contact_export(*first)
+        for contact_id, contact in contacts:
+            yield format_contact_export(contact_id, contact)
+    
+    elif output_format == 'csv':
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_CSV_COLUMNS)
+        for contact_id, contact in contacts:
+            addr = contact.get('address') or {}
+            writer.writerow([
+                contact_id, contact['first_name'], contact['last_name'],
+                contact['phone'], contact['email'],
+                addr.get('street', ''), addr.get('city', ''),
+                addr.get('state', ''), addr.get('zip_code', ''),
+                contact['category'], contact['notes'],
+                contact['created_date'], contact['last_modified']
+            ])
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            # Header of an empty export
+            yield buffer.getvalue()
+    
+    elif output_format == 'jsonl':
+        for contact_id, contact in contacts:
+            yield json.dumps({'contact_id': contact_id, **contact}, ensure_ascii=False,
+                             default=contact_json_default) + '\n'
+    
+    else:
+        raise ValueError(f"Unknown export format: {output_format}")
+
+def write_category_export(contacts_db, category, f, output_format='text'):
+    """
+    Stream a category export straight into an open file.
+    
+    Args:
+        contacts_db (dict): The main contacts database
+        category (str): Category to export
+        f (file): Text file object open for writing
+        output_format (str): 'text', 'csv' or 'jsonl'
+        
+    Returns:
+        int: Number of characters written
+    """
+    written = 0
+    for chunk in iter_category_export(contacts_db, category, output_format):
+        written += f.write(chunk)
+    return written
+
 def export_contacts_by_category(contacts_db, category):
     """
     Export contacts from a specific category as a formatted string.
@@ -533,134 +2215,1119 @@ def export_contacts_by_category(contacts_db, category):
     Returns:
         str: Formatted string representation of all contacts in category
     """
-    category_contacts = search_contacts_by_category(contacts_db, category)
+    return ''.join(iter_category_export(contacts_db, category))
+
+def detect_contact_file_format(filename):
+    """
+    Tell which on-disk format a saved contacts file uses.
     
-    if not category_contacts:
-        return f"No contacts found in category '{category}'."
+    Args:
+        filename (str): The file to inspect
+        
+    Returns:
+        str: 'binary' or 'text'
+    """
+    with open(filename, 'rb') as f:
+        magic = f.read(len(BINARY_FILE_MAGIC))
+    # Any version, so files of other versions are refused rather than parsed as text
+    return 'binary' if magic[:-1] == BINARY_FILE_MAGIC[:-1] else 'text'
+
+def escape_text_value(value):
+    """
+    Escape a value so it fits on one line of the text format.
     
-    output = f"--- Contacts in Category: {category} ---\n\n"
+    Args:
+        value: Field value (converted to str)
+        
+    Returns:
+        str: Value with backslashes, newlines and carriage returns escaped
+    """
+    value = str(value)
+    if '\\' in value:
+        value = value.replace('\\', '\\\\')
+    return value.replace('\n', '\\n').replace('\r', '\\r')
+
+def unescape_text_value(value):
+    """
+    Undo escape_text_value().
+    
+    Args:
+        value (str): Value as read from a text contacts file
+        
+    Returns:
+        str: The original value
+    """
+    if '\\' not in value:
+        return value
+    return TEXT_VALUE_ESCAPE.sub(lambda match: TEXT_VALUE_UNESCAPES[match.group(1)], value)
+
+def format_text_record(contact_id, contact, escape=str):
+    """
+    Format one contact as a block of the text format, without the blank
+    line that ends it.
     
-    for contact_id, contact in category_contacts.items():
-        output += f"Contact ID: {contact_id}\n"
-        output += f"Name: {contact['first_name']} {contact['last_name']}\n"
-        output += f"Phone: {contact['phone']}\n"
-        output += f"Email: {contact['email']}\n"
+    Args:
+        contact_id (str): The contact ID
+        contact (dict): The contact data
+        escape (callable): Turns each value into the text written for it
         
-        if contact['address']:
-            output += "Address:\n"
-            addr = contact['address']
-            if addr['street']:
-                output += f"  Street: {addr['street']}\n"
-            if addr['city']:
-                output += f"  City: {addr['city']}\n"
-            if addr['state']:
-                output += f"  State: {addr['state']}\n"
-            if addr['zip_code']:
-                output += f"  ZIP: {addr['zip_code']}\n"
+    Returns:
+        str: The '=== contact_id ===' line and one line per field
+    """
+    lines = [f"=== {contact_id} ==="]
+    for key, value in contact.items():
+        if key == 'address':
+            lines.append("address:")
+            for addr_key, addr_value in value.items():
+                lines.append(f"  {addr_key}: {escape(addr_value)}")
+        else:
+            lines.append(f"{key}: {escape(value)}")
+    return '\n'.join(lines)
+
+def write_contacts_text(f, contacts_db):
+    """
+    Write contacts in the readable '=== contact_id ===' text format.
+    
+    Args:
+        f (file): Text file object open for writing
+        contacts_db (dict): The contacts database
+    """
+    f.write(f"format: {TEXT_FORMAT_VERSION}\n")
+    # Persist the allocator so deleted IDs are not reused after a reload
+    if isinstance(contacts_db, ContactDatabase):
+        f.write(f"next_contact_number: {contacts_db.id_allocator.next_number}\n")
+    f.write("\n")
+    for contact_id, contact in contacts_db.items():
+        record = format_text_record(contact_id, contact)
+        # Most records have nothing to escape; the others are formatted again.
+        # A record has one line per field and address field, plus its header.
+        address = contact.get('address')
+        lines = len(contact) + (len(address) if address else 0)
+        if '\\' in record or '\r' in record or record.count('\n') != lines:
+            record = format_text_record(contact_id, contact, escape_text_value)
+        f.write(record)
+        f.write("\n\n")
+
+def encode_binary_record(contact_id, contact, strings, encode_json):
+    """
+    Encode one record of the binary format.
+    
+    Args:
+        contact_id (str): The contact ID
+        contact (dict): The contact data
+        strings (dict): String table being built, string -> number; new
+            interned strings are added to it
+        encode_json (callable): JSON encoder for contacts that do not fit
+            the fixed fields
         
-        output += f"Category: {contact['category']}\n"
-        if contact['notes']:
-            output += f"Notes: {contact['notes']}\n"
+    Returns:
+        bytes: The record, length prefix included
+    """
+    separator = CompactContact.SEPARATOR
+    try:
+        address = contact['address'] if len(contact) == len(CompactContact.KEYS) else None
+        if isinstance(address, Mapping):
+            flags = 1 if address else 0
+            for bit, field in enumerate(CompactContact.ADDRESS_FIELDS, 1):
+                if field in address:
+                    flags |= 1 << bit
+            if bin(flags >> 1).count('1') == len(address):
+                text = separator.join((
+                    contact_id, contact['first_name'], contact['last_name'], contact['phone'],
+                    contact['email'], contact['notes'], address.get('street', ''),
+                    address.get('city', ''), address.get('zip_code', '')))
+                numbers = []
+                for value in (contact['category'], address.get('state', ''),
+                              contact['created_date'], contact['last_modified']):
+                    number = strings.get(value)
+                    if number is None:
+                        if not isinstance(value, str) or separator in value:
+                            raise ValueError(value)
+                        number = strings[value] = len(strings)
+                    numbers.append(number)
+                if text.count(separator) == len(CompactContact.TEXT_FIELDS):
+                    record = BINARY_RECORD_STRINGS.pack(*numbers) + text.encode('utf-8')
+                    return BINARY_RECORD.pack(len(record), flags) + record
+    except (KeyError, TypeError, ValueError):
+        pass
+    record = encode_json([contact_id, contact]).encode('utf-8')
+    return BINARY_RECORD.pack(len(record), BINARY_JSON_RECORD) + record
+
+def decode_binary_record(buffer, offset, strings):
+    """
+    Decode the record of the binary format that starts at offset.
+    
+    Args:
+        buffer (bytes): The file contents, or a mapping of the file
+        offset (int): Where the record starts
+        strings (list): The file's string table
         
-        output += f"Created: {contact['created_date']}\n"
-        output += f"Last Modified: {contact['last_modified']}\n"
-        output += "-" * 40 + "\n\n"
+    Returns:
+        tuple: (contact_id, contact_data)
+    """
+    length, kind = BINARY_RECORD.unpack_from(buffer, offset)
+    start = offset + BINARY_RECORD.size
+    if kind == BINARY_JSON_RECORD:
+        contact_id, contact = json.loads(buffer[start:start + length])
+        return contact_id, contact
+    if kind >= BINARY_JSON_RECORD:
+        raise ValueError(f"unknown binary record kind {kind}")
     
-    return output
+    category, state, created, modified = BINARY_RECORD_STRINGS.unpack_from(buffer, start)
+    (contact_id, first_name, last_name, phone, email, notes, street, city,
+     zip_code) = str(buffer[start + BINARY_RECORD_STRINGS.size:start + length],
+                     'utf-8').split(CompactContact.SEPARATOR)
+    address = {}
+    if kind & 1:
+        stored = {'street': street, 'city': city, 'state': strings[state], 'zip_code': zip_code}
+        address = {field: stored[field] for bit, field in enumerate(CompactContact.ADDRESS_FIELDS, 1)
+                   if kind & (1 << bit)}
+    return contact_id, {
+        'first_name': first_name,
+        'last_name': last_name,
+        'phone': phone,
+        'email': email,
+        'address': address,
+        'category': strings[category],
+        'notes': notes,
+        'created_date': strings[created],
+        'last_modified': strings[modified]
+    }
+
+def read_binary_header(buffer, filename):
+    """
+    Check and unpack the header of a binary contacts file.
+    
+    Args:
+        buffer (bytes): The file contents, or a mapping of the file
+        filename (str): File name for error messages
+        
+    Returns:
+        tuple: (next contact number, record count, index offset, ID block
+        length, string table, where the index arrays start)
+        
+    Raises:
+        ValueError: If the file is not a complete binary contacts file of
+            this version
+    """
+    if len(buffer) < BINARY_HEADER.size:
+        raise ValueError(f"{filename} is not a binary contacts file")
+    (magic, next_number, count, index_offset, ids_length,
+     strings_length) = BINARY_HEADER.unpack_from(buffer)
+    if magic != BINARY_FILE_MAGIC:
+        raise ValueError(f"{filename} is not a binary contacts file of version "
+                         f"{BINARY_FILE_MAGIC[-1]}")
+    strings_start = index_offset + ids_length
+    tables_start = strings_start + strings_length
+    if len(buffer) < tables_start + 8 * (4 * count + 1):
+        raise ValueError(f"{filename} is truncated")
+    strings = str(buffer[strings_start:tables_start], 'utf-8').split(CompactContact.SEPARATOR)
+    return next_number, count, index_offset, ids_length, strings, tables_start
+
+def write_contacts_binary(f, contacts_db):
+    """
+    Write contacts as fixed-field records followed by an ID index.
+    
+    Args:
+        f (file): Binary file object open for writing
+        contacts_db (dict): The contacts database
+    """
+    next_number = 0
+    if isinstance(contacts_db, ContactDatabase):
+        next_number = contacts_db.id_allocator.next_number
+    
+    # Placeholder header, rewritten once the index position is known
+    f.write(BINARY_HEADER.pack(BINARY_FILE_MAGIC, 0, 0, 0, 0, 0))
+    
+    offset = BINARY_HEADER.size
+    offsets = array.array('Q')
+    strings = {}
+    encode_json = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'),
+                                   default=contact_json_default).encode
+    for contact_id, contact in contacts_db.items():
+        record = encode_binary_record(contact_id, contact, strings, encode_json)
+        f.write(record)
+        offsets.append(offset)
+        offset += len(record)
+    
+    # Sorted so readers can binary search the IDs inside the file
+    encoded_ids = [contact_id.encode('utf-8') for contact_id in contacts_db]
+    id_records = array.array('Q', sorted(range(len(encoded_ids)), key=encoded_ids.__getitem__))
+    id_starts = array.array('Q', [0])
+    id_ranks = array.array('Q', bytes(8 * len(encoded_ids)))
+    for rank, record in enumerate(id_records):
+        id_starts.append(id_starts[-1] + len(encoded_ids[record]))
+        id_ranks[record] = rank
+    
+    ids_block = b''.join(encoded_ids[record] for record in id_records)
+    strings_block = CompactContact.SEPARATOR.join(strings).encode('utf-8')
+    f.write(ids_block)
+    f.write(strings_block)
+    for table in (id_starts, id_records, id_ranks, offsets):
+        f.write(table.tobytes())
+    
+    f.seek(0)
+    f.write(BINARY_HEADER.pack(BINARY_FILE_MAGIC, next_number, len(offsets), offset,
+                               len(ids_block), len(strings_block)))
 
-def save_contacts_to_file(contacts_db, filename):
+def write_contacts_file_atomically(contacts_db, filename, file_format):
     """
-    Save contacts database to a text file in a readable format.
+    Write a complete contacts file so that a crash never leaves it half
+    written: the data goes to a temporary file that replaces the old one.
+    
+    Args:
+        contacts_db (dict): The contacts database
+        filename (str): The filename to write
+        file_format (str): 'text' or 'binary'
+    """
+    temp_filename = filename + '.tmp'
+    if file_format == 'binary':
+        with open(temp_filename, 'wb') as f:
+            write_contacts_binary(f, contacts_db)
+            f.flush()
+            os.fsync(f.fileno())
+    else:
+        with open(temp_filename, 'w') as f:
+            write_contacts_text(f, contacts_db)
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(temp_filename, filename)
+
+def save_contacts_to_file(contacts_db, filename, file_format=None):
+    """
+    Save contacts database to a file.
     
     Args:
         contacts_db (dict): The contacts database
         filename (str): The filename to save to
+        file_format (str): 'text' or 'binary'. By default an existing file
+            keeps its format and new files are written as binary, which
+            loads faster and can be opened with open_contacts_file().
     """
     try:
-        with open(filename, 'w') as f:
-            for contact_id, contact in contacts_db.items():
-                f.write(f"=== {contact_id} ===\n")
-                for key, value in contact.items():
-                    if key == 'address':
-                        f.write("address:\n")
-                        for addr_key, addr_value in value.items():
-                            f.write(f"  {addr_key}: {addr_value}\n")
-                    else:
-                        f.write(f"{key}: {value}\n")
-                f.write("\n")
+        if file_format is None:
+            try:
+                file_format = detect_contact_file_format(filename)
+            except FileNotFoundError:
+                file_format = DEFAULT_FILE_FORMAT
+        
+        write_contacts_file_atomically(contacts_db, filename, file_format)
         print(f"Contacts saved to {filename} successfully.")
         return True
     except IOError as e:
         print(f"Error saving to file: {e}")
         return False
 
-def load_contacts_from_file(filename):
+def iter_contacts_from_binary_file(filename, header=None):
     """
-    Load contacts database from a text file.
-    Return empty dict if file doesn't exist.
+    Read the records of a binary contacts file one at a time.
     
     Args:
-        filename (str): The filename to load from
+        filename (str): The filename to read from
+        header (dict): Optional dict that receives 'next_contact_number'
         
-    Returns:
-        dict: The loaded contacts database
+    Yields:
+        tuple: (contact_id, contact_data) for each contact in file order
     """
-    contacts_db = {}
-    try:
-        with open(filename, 'r') as f:
-            lines = f.readlines()
+    with open(filename, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        next_number, count, _, _, strings, _ = read_binary_header(data, filename)
+        if header is not None and next_number:
+            header['next_contact_number'] = str(next_number)
         
-        current_contact_id = None
-        current_contact = {}
-        in_address = False
-        current_address = {}
+        offset = BINARY_HEADER.size
+        for _ in range(count):
+            yield decode_binary_record(data, offset, strings)
+            offset += BINARY_RECORD.size + BINARY_RECORD.unpack_from(data, offset)[0]
+
+class MappedContactDatabase(Mapping):
+    """
+    Read-only contacts database over a memory-mapped binary contacts file.
+
+    Opening only reads the header: IDs are binary searched in the sorted ID
+    index inside the mapping and contact dicts are decoded on access, so
+    memory grows with the records actually touched rather than with the
+    file size.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self._file = open(filename, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"{filename} is not a binary contacts file")
         
-        for line in lines:
-            line = line.strip()
+        try:
+            (next_number, count, index_offset, _, self._strings,
+             tables_start) = read_binary_header(self._map, filename)
+        except ValueError:
+            self.close()
+            raise
+        tables_end = tables_start + 8 * (4 * count + 1)
+        self.next_contact_number = next_number
+        
+        # Views into the mapping, nothing is copied
+        tables = memoryview(self._map)[tables_start:tables_end].cast('Q')
+        self._tables = (
+            tables,
+            tables[:count + 1],
+            tables[count + 1:2 * count + 1],
+            tables[2 * count + 1:3 * count + 1],
+            tables[3 * count + 1:],
+        )
+        _, self._id_starts, self._id_records, self._id_ranks, self._offsets = self._tables
+        self._count = count
+        self._index_offset = index_offset
+
+    def _id_at(self, rank):
+        start = self._index_offset + self._id_starts[rank]
+        return self._map[start:self._index_offset + self._id_starts[rank + 1]]
+
+    def _position(self, contact_id):
+        """Return the record number of contact_id, or -1 if it is missing."""
+        if not isinstance(contact_id, str):
+            return -1
+        key = contact_id.encode('utf-8')
+        rank = bisect.bisect_left(range(self._count), key, key=self._id_at)
+        if rank < self._count and self._id_at(rank) == key:
+            return self._id_records[rank]
+        return -1
+
+    def _read_record(self, position):
+        return decode_binary_record(self._map, self._offsets[position], self._strings)
+
+    def __getitem__(self, contact_id):
+        position = self._position(contact_id)
+        if position < 0:
+            raise KeyError(contact_id)
+        return self._read_record(position)[1]
+
+    def __contains__(self, contact_id):
+        return self._position(contact_id) >= 0
+
+    def __iter__(self):
+        # File order, like the database that was saved
+        for position in range(self._count):
+            yield self._id_at(self._id_ranks[position]).decode('utf-8')
+
+    def __len__(self):
+        return self._count
+
+    def _records_containing(self, needle):
+        """Yield, in order, the record numbers whose bytes contain needle."""
+        position = BINARY_HEADER.size
+        while True:
+            position = self._map.find(needle, position, self._index_offset)
+            if position == -1:
+                return
+            record = bisect.bisect_right(self._offsets, position) - 1
+            yield record
+            # Continue after the record that was just found
+            if record + 1 >= self._count:
+                return
+            position = self._offsets[record + 1]
+
+    def find_by_field(self, field, value):
+        """
+        Find contacts whose top-level field equals value.
+        
+        For the free-text fields, searches the raw mapped bytes for the
+        value (as stored in fixed-field and in JSON records) and decodes
+        only the records that contain it; other fields are compared in
+        every record.
+        
+        Args:
+            field (str): Contact field name, e.g. 'phone'
+            value (str): Exact value to match
+            
+        Yields:
+            tuple: (contact_id, contact_data) in file order
+        """
+        if field in CompactContact.TEXT_FIELDS[:5] and isinstance(value, str) and value:
+            needles = {value.encode('utf-8'),
+                       json.dumps(value, ensure_ascii=False)[1:-1].encode('utf-8')}
+            records = heapq.merge(*map(self._records_containing, needles))
+        else:
+            records = range(self._count)
+        
+        previous = -1
+        for record in records:
+            if record == previous:
+                continue
+            previous = record
+            contact_id, contact = self._read_record(record)
+            if contact.get(field) == value:
+                yield contact_id, contact
+
+    def close(self):
+        """Release the memory mapping and the underlying file."""
+        for table in getattr(self, '_tables', ()):
+            table.release()
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def open_contacts_file(filename):
+    """
+    Open a binary contacts file for read-only random access.
+    
+    Works with display_contact(), list_all_contacts() and
+    find_contact_by_phone() without loading every contact.
+    
+    Files saved by save_contacts_to_file() are binary unless they were
+    written as text; text files have to be loaded with
+    load_contacts_from_file() instead.
+    
+    Args:
+        filename (str): A file written with file_format='binary'
+        
+    Returns:
+        MappedContactDatabase: The read-only contacts database
+        
+    Raises:
+        ValueError: If the file is not a binary contacts file
+    """
+    return MappedContactDatabase(filename)
+
+def iter_contacts_from_file(filename, header=None):
+    """
+    Parse a saved contacts file one record at a time.
+    
+    Only the record being parsed is kept in memory, so callers can stop
+    early or filter contacts without loading the whole file. Binary files
+    are detected and handed to iter_contacts_from_binary_file(). Text
+    files without the 'format: 2' line were written before values were
+    escaped, so their values are read literally.
+    
+    Args:
+        filename (str): The filename to read from
+        header (dict): Optional dict that receives the 'key: value' lines
+            written before the first contact
+        
+    Yields:
+        tuple: (contact_id, contact_data) for each contact in file order
+    """
+    if detect_contact_file_format(filename) == 'binary':
+        yield from iter_contacts_from_binary_file(filename, header)
+        return
+    
+    contact_id = None
+    contact = {}
+    address = None
+    # Only files with the format line have escaped values
+    escaped = False
+    
+    with open(filename, 'r') as f:
+        for line in f:
+            line = line.rstrip('\r\n')
             
             if line.startswith('===') and line.endswith('==='):
-                # Save previous contact if exists
-                if current_contact_id and current_contact:
-                    if current_address:
-                        current_contact['address'] = current_address
-                    contacts_db[current_contact_id] = current_contact
+                if contact_id and contact:
+                    yield contact_id, contact
                 
                 # Start new contact
-                current_contact_id = line[4:-4].strip()  # Extract ID from === ID ===
-                current_contact = {}
-                current_address = {}
-                in_address = False
-                
-            elif line == 'address:':
-                in_address = True
-                
-            elif in_address and line.startswith('  '):
-                # Address field
-                if ': ' in line[2:]:
-                    key, value = line[2:].split(': ', 1)
-                    current_address[key] = value
-                    
-            elif ': ' in line:
-                # Regular field
-                key, value = line.split(': ', 1)
-                current_contact[key] = value
-                in_address = False
-                
-        # Save the last contact
-        if current_contact_id and current_contact:
-            if current_address:
-                current_contact['address'] = current_address
-            contacts_db[current_contact_id] = current_contact
+                contact_id = line[4:-4].strip()  # Extract ID from === ID ===
+                contact = {}
+                address = None
+                continue
+            
+            if line == 'address:':
+                address = {}
+                contact['address'] = address
+                continue
+            
+            key, separator, value = line.lstrip().partition(': ')
+            if not separator:
+                if not line.endswith(':'):
+                    continue
+                # Empty value whose trailing space was stripped by an editor
+                key = line.strip()[:-1]
+            if escaped and '\\' in value:
+                value = unescape_text_value(value)
             
+            if contact_id is None:
+                # Settings written ahead of the first contact
+                if key == 'format':
+                    if value != TEXT_FORMAT_VERSION:
+                        raise ValueError(f"{filename} uses unknown text format {value!r}")
+                    escaped = True
+                if header is not None:
+                    header[key] = value
+            elif address is not None and line.startswith('  '):
+                address[key] = value
+            else:
+                contact[key] = value
+                address = None
+    
+    # The last contact
+    if contact_id and contact:
+        yield contact_id, contact
+
+@contextlib.contextmanager
+def paused_garbage_collection():
+    """
+    Pause the cyclic garbage collector while building many objects.
+    
+    Loading creates several dicts per contact, all kept alive, so the
+    collections they would trigger only rescan them without freeing
+    anything.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+def read_contacts_file(filename, contact_filter=None):
+    """
+    Load a contacts database from a text or binary file, raising on errors.
+    
+    Args:
+        filename (str): The filename to load from
+        contact_filter (callable): Optional predicate taking
+            (contact_id, contact_data); only matching contacts are loaded
+        
+    Returns:
+        ContactDatabase: The loaded contacts database
+        
+    Raises:
+        FileNotFoundError: If the file does not exist
+        OSError, ValueError, struct.error: If the file cannot be read or parsed
+    """
+    header = {}
+    contacts = {}
+    with paused_garbage_collection():
+        for contact_id, contact in iter_contacts_from_file(filename, header):
+            if contact_filter is None or contact_filter(contact_id, contact):
+                contacts[contact_id] = contact
+        # Indexed in one batch once the IDs are known to be distinct
+        contacts_db = ContactDatabase()
+        contacts_db.add_many(contacts.items())
+    
+    # Allocator state, so IDs of deleted contacts stay retired
+    if 'next_contact_number' in header:
+        contacts_db.id_allocator.next_number = max(
+            contacts_db.id_allocator.next_number,
+            int(header['next_contact_number']))
+    return contacts_db
+
+def load_contacts_from_file(filename, contact_filter=None):
+    """
+    Load contacts database from a text or binary file.
+    Return empty dict if file doesn't exist.
+    
+    Args:
+        filename (str): The filename to load from
+        contact_filter (callable): Optional predicate taking
+            (contact_id, contact_data); only matching contacts are loaded
+        
+    Returns:
+        ContactDatabase: The loaded contacts database
+    """
+    try:
+        contacts_db = read_contacts_file(filename, contact_filter)
         print(f"Contacts loaded from {filename} successfully.")
         return contacts_db
         
     except FileNotFoundError:
         print(f"File {filename} not found. Starting with empty database.")
-        return {}
+        return ContactDatabase()
     except Exception as e:
         print(f"Error loading from file: {e}")
-        return {}
+        return ContactDatabase()
+
+class ContactJournal:
+    """
+    Append-only log of contact changes kept next to a snapshot file.
+
+    Every add, update, delete and merge on the attached ContactDatabase is
+    appended to '<snapshot>.log' as one JSON line, so saving a change costs
+    one small write instead of rewriting the whole database. The snapshot
+    is only rewritten by compact(), which runs every compact_every entries.
+    """
+
+    def __init__(self, snapshot_filename, compact_every=10000, durable=False,
+                 file_format=None):
+        self.snapshot_filename = snapshot_filename
+        self.log_filename = snapshot_filename + '.log'
+        self.compact_every = compact_every
+        self.durable = durable
+        self.file_format = file_format
+        self.contacts_db = None
+        self.entries = 0
+        self._log = None
+        self._encode = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'),
+                                        default=contact_json_default).encode
+
+    def replay(self, contacts_db):
+        """
+        Apply the logged changes on top of a freshly loaded snapshot.
+        
+        A last entry cut short by a crash is dropped from the log.
+        
+        Args:
+            contacts_db (ContactDatabase): The loaded snapshot
+            
+        Returns:
+            int: Number of entries replayed
+        """
+        valid_size = 0
+        try:
+            f = open(self.log_filename, 'rb')
+        except FileNotFoundError:
+            return 0
+        
+        with f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break
+                
+                if entry[0] == 'set':
+                    contacts_db[entry[1]] = entry[2]
+                elif entry[0] == 'delete':
+                    contacts_db.pop(entry[1], None)
+                elif entry[0] == 'clear':
+                    contacts_db.clear()
+                valid_size += len(line)
+                self.entries += 1
+        
+        # Drop a torn entry so new entries start on a clean line
+        if valid_size < os.path.getsize(self.log_filename):
+            with open(self.log_filename, 'r+b') as f:
+                f.truncate(valid_size)
+        return self.entries
+
+    def attach(self, contacts_db):
+        """
+        Start logging every change made to contacts_db.
+        
+        Args:
+            contacts_db (ContactDatabase): The database to journal
+        """
+        self.contacts_db = contacts_db
+        self._log = open(self.log_filename, 'ab')
+        contacts_db.journal = self
+
+    def record(self, operation, contact_id=None, contact=None):
+        """
+        Append one change to the log.
+        
+        Args:
+            operation (str): 'set', 'delete' or 'clear'
+            contact_id (str): The contact changed
+            contact (dict): The new contact data for 'set'
+        """
+        if operation == 'set':
+            entry = [operation, contact_id, contact]
+        elif operation == 'delete':
+            entry = [operation, contact_id]
+        else:
+            entry = [operation]
+        self._log.write((self._encode(entry) + '\n').encode('utf-8'))
+        self._log.flush()
+        if self.durable:
+            os.fsync(self._log.fileno())
+        
+        self.entries += 1
+        if self.compact_every and self.entries >= self.compact_every:
+            self.compact()
+
+    def compact(self):
+        """
+        Rewrite the snapshot from the current contacts and empty the log.
+        
+        The snapshot is replaced atomically before the log is emptied, and
+        replaying a log over a snapshot that already contains it gives the
+        same contacts, so a crash at any point loses nothing.
+        """
+        file_format = self.file_format
+        if file_format is None:
+            try:
+                file_format = detect_contact_file_format(self.snapshot_filename)
+            except FileNotFoundError:
+                file_format = DEFAULT_FILE_FORMAT
+        write_contacts_file_atomically(self.contacts_db, self.snapshot_filename, file_format)
+        
+        self._log.truncate(0)
+        self._log.flush()
+        os.fsync(self._log.fileno())
+        self.entries = 0
+
+    def close(self):
+        """Stop journaling and close the log file."""
+        if self.contacts_db is not None:
+            self.contacts_db.journal = None
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+def open_journaled_contacts(filename, compact_every=10000, durable=False,
+                            file_format=None):
+    """
+    Load a snapshot, replay its log and journal all further changes.
+    
+    A missing snapshot starts an empty database. A snapshot that cannot be
+    read is an error: treating it as empty would let the next compact()
+    replace it with only the logged changes.
+    
+    Args:
+        filename (str): The snapshot filename
+        compact_every (int): Log entries between automatic compactions
+            (0 to only compact on request)
+        durable (bool): fsync the log after every entry
+        file_format (str): Snapshot format used when compacting; by
+            default the snapshot's own, or binary for a new one
+        
+    Returns:
+        ContactDatabase: The contacts database, journaling to filename + '.log'
+        
+    Raises:
+        OSError, ValueError, struct.error: If the snapshot exists but cannot
+            be read; no journal is attached
+    """
+    try:
+        contacts_db = read_contacts_file(filename)
+    except FileNotFoundError:
+        contacts_db = ContactDatabase()
+    journal = ContactJournal(filename, compact_every, durable, file_format)
+    journal.replay(contacts_db)
+    journal.attach(contacts_db)
+    return contacts_db
+
+class ReadWriteLock:
+    """
+    Lock that lets many readers in at once but writers only one at a time.
+
+    Waiting writers block new readers, so a steady stream of searches
+    cannot starve updates.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._readers = 0
+        self._writer = False
+        self._writers_waiting = 0
+
+    @contextlib.contextmanager
+    def read_locked(self):
+        with self._condition:
+            while self._writer or self._writers_waiting:
+                self._condition.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers -= 1
+                if not self._readers:
+                    self._condition.notify_all()
+
+    @contextlib.contextmanager
+    def write_locked(self):
+        with self._condition:
+            self._writers_waiting += 1
+            while self._writer or self._readers:
+                self._condition.wait()
+            self._writers_waiting -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writer = False
+                self._condition.notify_all()
+
+def copy_contact(contact):
+    """
+    Copy a contact so it can be handed out while the database changes.
+    
+    Args:
+        contact (dict): Contact information dictionary
+        
+    Returns:
+        dict: Copy with its own address dictionary
+    """
+    contact = dict(contact)
+    if isinstance(contact.get('address'), Mapping):
+        contact['address'] = dict(contact['address'])
+    return contact
+
+class ContactStore:
+    """
+    Thread-safe contact database for serving several clients.
+
+    Wraps a ContactDatabase and the module functions that operate on it:
+    searches run in parallel under a shared read lock, while adds, updates,
+    deletes and merges take the write lock one at a time. Every write ends
+    with the database's lazy index work done, still under the write lock,
+    so the searches never modify it. Contacts are returned as copies so
+    callers never see a half-applied update.
+    """
+
+    def __init__(self, contacts_db=None):
+        if contacts_db is None:
+            contacts_db = ContactDatabase()
+        elif not isinstance(contacts_db, ContactDatabase):
+            contacts_db = ContactDatabase(contacts_db)
+        contacts_db.update_lazy_indexes()
+        self.contacts_db = contacts_db
+        self.lock = ReadWriteLock()
+
+    @contextlib.contextmanager
+    def _write_locked(self):
+        with self.lock.write_locked():
+            try:
+                yield
+            finally:
+                self.contacts_db.update_lazy_indexes()
+
+    @classmethod
+    def from_file(cls, filename):
+        """
+        Returns:
+            ContactStore: Store over the contacts loaded from filename
+        """
+        return cls(load_contacts_from_file(filename))
+
+    # --- writers ---
+
+    def add_contact(self, contact_data):
+        # Store a copy, so the caller cannot change it outside the lock
+        if contact_data:
+            contact_data = copy_contact(contact_data)
+        with self._write_locked():
+            return add_contact(self.contacts_db, contact_data)
+
+    def add_contacts_bulk(self, contacts):
+        with self._write_locked():
+            return add_contacts_bulk(self.contacts_db, contacts)
+
+    def update_contact(self, contact_id, field_updates):
+        with self._write_locked():
+            return update_contact(self.contacts_db, contact_id, field_updates)
+
+    def delete_contact(self, contact_id):
+        """
+        Delete a contact without the confirmation prompt of delete_contact().
+
+        Returns:
+            bool: True if the contact existed
+        """
+        with self._write_locked():
+            if contact_id not in self.contacts_db:
+                return False
+            del self.contacts_db[contact_id]
+            return True
+
+    def merge_contact_groups(self, groups, rule='non_empty'):
+        with self._write_locked():
+            return merge_contact_groups(self.contacts_db, groups, rule)
+
+    # --- readers ---
+
+    def get_contact(self, contact_id):
+        """
+        Returns:
+            dict: Copy of the contact, or None if not found
+        """
+        with self.lock.read_locked():
+            contact = self.contacts_db.get(contact_id)
+            return copy_contact(contact) if contact is not None else None
+
+    def _copy_results(self, results):
+        return {contact_id: copy_contact(contact) for contact_id, contact in results.items()}
+
+    def search_contacts_by_name(self, search_term):
+        with self.lock.read_locked():
+            return self._copy_results(search_contacts_by_name(self.contacts_db, search_term))
+
+    def search_contacts_ranked(self, search_term, limit=10):
+        with self.lock.read_locked():
+            return self._copy_results(search_contacts_ranked(self.contacts_db, search_term, limit))
+
+    def search_contacts_by_category(self, category):
+        with self.lock.read_locked():
+            return self._copy_results(search_contacts_by_category(self.contacts_db, category))
+
+    def find_contact_by_phone(self, phone_number):
+        with self.lock.read_locked():
+            contact_id, contact = find_contact_by_phone(self.contacts_db, phone_number)
+            return (contact_id, copy_contact(contact) if contact is not None else None)
+
+    def find_contact_by_email(self, email):
+        with self.lock.read_locked():
+            contact_id, contact = find_contact_by_email(self.contacts_db, email)
+            return (contact_id, copy_contact(contact) if contact is not None else None)
+
+    def generate_contact_statistics(self):
+        with self.lock.read_locked():
+            return generate_contact_statistics(self.contacts_db)
+
+    def find_duplicate_contacts(self):
+        with self.lock.read_locked():
+            return find_duplicate_contacts(self.contacts_db)
+
+    def save_contacts_to_file(self, filename, file_format=None):
+        with self.lock.read_locked():
+            return save_contacts_to_file(self.contacts_db, filename, file_format)
+
+    def __len__(self):
+        with self.lock.read_locked():
+            return len(self.contacts_db)
+
+class ContactStoreRequestHandler(BaseHTTPRequestHandler):
+    """
+    JSON-over-HTTP front end for a ContactStore.
+
+    GET    /contacts/<id>
+    GET    /search?name=...&limit=...  |  ?category=...  |  ?phone=...
+    GET    /stats
+    POST   /contacts            body: contact JSON
+    PATCH  /contacts/<id>       body: field updates JSON
+    DELETE /contacts/<id>
+    """
+    store = None
+
+    def _send_json(self, status, data):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        """
+        Read a JSON object of contact fields from the request body.
+
+        Returns:
+            dict: The fields, or None after answering 400 if the body is not
+            a JSON object of strings (with 'address' an object of strings)
+        """
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            if length < 0:
+                raise ValueError(length)
+            data = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            self._send_json(400, {'error': 'Request body must be a JSON object'})
+            return None
+        
+        if not isinstance(data, dict):
+            error = 'Request body must be a JSON object'
+        else:
+            error = None
+            for field, value in data.items():
+                if field == 'address':
+                    if not isinstance(value, dict) or not all(
+                            isinstance(item, str) for item in value.values()):
+                        error = "'address' must be an object of strings"
+                        break
+                elif not isinstance(value, str):
+                    error = f"'{field}' must be a string"
+                    break
+        if error:
+            self._send_json(400, {'error': error})
+            return None
+        return data
+
+    def _contact_id(self, path):
+        if path.startswith('/contacts/'):
+            return path[len('/contacts/'):]
+        return None
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        contact_id = self._contact_id(url.path)
+        
+        if contact_id:
+            contact = self.store.get_contact(contact_id)
+            if contact is None:
+                self._send_json(404, {'error': f'Contact {contact_id} not found'})
+            else:
+                self._send_json(200, contact)
+        elif url.path == '/search' and 'name' in query:
+            limit = query.get('limit')
+            if limit is not None:
+                if not limit.isdecimal():
+                    self._send_json(400, {'error': "'limit' must be a non-negative integer"})
+                    return
+                limit = int(limit)
+            self._send_json(200, self.store.search_contacts_ranked(query['name'], limit))
+        elif url.path == '/search' and 'category' in query:
+            self._send_json(200, self.store.search_contacts_by_category(query['category']))
+        elif url.path == '/search' and 'phone' in query:
+            contact_id, contact = self.store.find_contact_by_phone(query['phone'])
+            self._send_json(200, {contact_id: contact} if contact_id else {})
+        elif url.path == '/stats':
+            self._send_json(200, self.store.generate_contact_statistics())
+        else:
+            self._send_json(404, {'error': 'Unknown path'})
+
+    def do_POST(self):
+        if urlsplit(self.path).path != '/contacts':
+            self._send_json(404, {'error': 'Unknown path'})
+            return
+        contact = self._read_json()
+        if contact is None:
+            return
+        report = self.store.add_contacts_bulk([contact])
+        if report['rejected']:
+            self._send_json(400, {'error': report['rejected'][0][1]})
+        else:
+            self._send_json(201, {'contact_id': report['added'][0]})
+
+    def do_PATCH(self):
+        contact_id = self._contact_id(urlsplit(self.path).path)
+        field_updates = self._read_json()
+        if field_updates is None:
+            return
+        if contact_id and self.store.update_contact(contact_id, field_updates):
+            self._send_json(200, {'contact_id': contact_id})
+        else:
+            self._send_json(400, {'error': f'Could not update {contact_id}'})
+
+    def do_DELETE(self):
+        contact_id = self._contact_id(urlsplit(self.path).path)
+        if contact_id and self.store.delete_contact(contact_id):
+            self._send_json(200, {'contact_id': contact_id})
+        else:
+            self._send_json(404, {'error': f'Contact {contact_id} not found'})
+
+    def log_message(self, format, *args):
+        pass
+
+def serve_contact_store(store, host='127.0.0.1', port=8000):
+    """
+    Create a multi-threaded HTTP server for a ContactStore.
+    
+    Every request runs on its own thread; the store's lock keeps them safe.
+    Call serve_forever() on the result to start serving.
+    
+    Args:
+        store (ContactStore): The store to serve
+        host (str): Interface to bind
+        port (int): Port to bind (0 picks a free port)
+        
+    Returns:
+        ThreadingHTTPServer: The server, not yet serving
+    """
+    handler = type('BoundContactStoreRequestHandler', (ContactStoreRequestHandler,),
+                   {'store': store})
+    return ThreadingHTTPServer((host, port), handler)
 
 def main_menu():
     """
@@ -898,7 +3565,7 @@ def run_contact_manager():
     Initialize empty database and start the menu loop.
     """
     global contacts_db
-    contacts_db = {}
+    contacts_db = ContactDatabase()
     print("Welcome to the Contact Management System!")
     main_menu()
 
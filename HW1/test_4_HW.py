@@ -4,7 +4,10 @@ CS1350 Week 1 Homework
 """
 
 import contact_manager as cm
+import copy
 import datetime
+import pickle
+import struct
 
 def test_create_contact():
     """Test contact creation with valid and invalid data."""
@@ -225,6 +228,775 @@ def test_validation_functions():
     
     print("Validation tests passed!\n")
 
+def test_contact_indexes():
+    """Test that the indexed database stays in sync with mutations."""
+    print("Testing contact indexes...")
+    
+    db = cm.ContactDatabase()
+    contact1 = {
+        'first_name': 'Alice',
+        'last_name': 'Johnson',
+        'phone': '111-222-3333',
+        'email': 'alice@example.com',
+        'category': 'work',
+        'notes': '',
+        'created_date': '2024-01-15',
+        'last_modified': '2024-01-15'
+    }
+    contact2 = dict(contact1, first_name='Bob', phone='444-555-6666',
+                    email='bob@example.com', category='personal')
+    id1 = cm.add_contact(db, contact1)
+    id2 = cm.add_contact(db, contact2)
+    
+    # Lookups match the linear-scan results
+    assert cm.find_contact_by_phone(db, '444-555-6666')[0] == id2
+    assert cm.find_contact_by_email(db, 'alice@example.com')[0] == id1
+    assert list(cm.search_contacts_by_category(db, 'WORK')) == [id1]
+    assert list(cm.search_contacts_by_name(db, 'john')) == [id1, id2]
+    print("   ✓ Indexed lookups work correctly")
+    
+    # Updates move the contact to its new index entries
+    cm.update_contact(db, id1, {'phone': '999-888-7777', 'category': 'family'})
+    assert cm.find_contact_by_phone(db, '111-222-3333') == (None, None)
+    assert cm.find_contact_by_phone(db, '999-888-7777')[0] == id1
+    assert cm.search_contacts_by_category(db, 'work') == {}
+    print("   ✓ Indexes follow updates")
+    
+    # Deleted contacts disappear from every index
+    del db[id2]
+    assert cm.find_contact_by_email(db, 'bob@example.com') == (None, None)
+    assert list(cm.search_contacts_by_name(db, 'bob')) == []
+    db.clear()
+    assert all(not index for index in db.indexes.values())
+    print("   ✓ Indexes follow deletes")
+    
+    # Copies get indexes, statistics and an allocator of their own
+    id3 = cm.add_contact(db, {'first_name': 'Carol', 'last_name': 'Jones',
+                              'phone': '777-888-9999', 'email': 'carol@example.com',
+                              'address': {}, 'category': 'work', 'notes': '',
+                              'created_date': '2024-01-15', 'last_modified': '2024-01-15'})
+    for duplicate in (copy.copy(db), copy.deepcopy(db), pickle.loads(pickle.dumps(db))):
+        assert isinstance(duplicate, cm.ContactDatabase) and duplicate == db
+        assert cm.generate_contact_statistics(db)['total_contacts'] == 1
+        assert cm.verify_contact_statistics(db) and cm.verify_contact_statistics(duplicate)
+        del duplicate[id3]
+        assert cm.find_contact_by_phone(db, '777-888-9999')[0] == id3
+        assert duplicate.id_allocator.next_number == db.id_allocator.next_number
+    assert copy.deepcopy(db)[id3] is not db[id3]
+    print("   ✓ Copies and pickles are independent of the original")
+    
+    print("Contact index tests passed!\n")
+
+def test_contact_id_allocation():
+    """Test that contact IDs are monotonic and never reused."""
+    print("Testing contact ID allocation...")
+    
+    db = cm.ContactDatabase()
+    contact = {
+        'first_name': 'Test',
+        'last_name': 'User',
+        'phone': '123-456-7890',
+        'email': '',
+        'category': 'personal',
+        'notes': '',
+        'created_date': '2024-01-15',
+        'last_modified': '2024-01-15'
+    }
+    id1 = cm.add_contact(db, dict(contact))
+    id2 = cm.add_contact(db, dict(contact))
+    assert (id1, id2) == ('contact_001', 'contact_002')
+    
+    # Deleting the newest contact must not free its ID
+    del db[id2]
+    assert cm.add_contact(db, dict(contact)) == 'contact_003'
+    print("   ✓ Deleted IDs are not reused")
+    
+    # Block reservation and seeding from explicitly inserted IDs
+    assert cm.reserve_contact_ids(db, 3) == ['contact_004', 'contact_005', 'contact_006']
+    db['contact_050'] = dict(contact)
+    assert cm.generate_contact_id(db) == 'contact_051'
+    print("   ✓ ID blocks and seeding work correctly")
+    
+    print("Contact ID allocation tests passed!\n")
+
+def test_bulk_import():
+    """Test batch import with a rejection report."""
+    print("Testing bulk import...")
+    
+    db = cm.ContactDatabase()
+    rows = [
+        {'first_name': 'Alice', 'last_name': 'Johnson', 'phone': '111-222-3333'},
+        {'first_name': 'Bob', 'last_name': 'Smith', 'phone': '4445556666'},
+        {'first_name': '', 'last_name': 'Nobody', 'phone': '777-888-9999'},
+        {'first_name': 'Carol', 'last_name': 'Johnson', 'phone': '777-888-9999',
+         'category': 'work'},
+    ]
+    report = cm.add_contacts_bulk(db, rows)
+    assert report['added'] == ['contact_001', 'contact_002']
+    assert report['rejected'] == [(1, 'invalid phone'), (2, 'missing name')]
+    print("   ✓ Invalid rows are reported")
+    
+    # Imported contacts are complete and indexed
+    assert db['contact_001']['email'] == ''
+    assert list(cm.search_contacts_by_category(db, 'work')) == ['contact_002']
+    assert cm.find_contact_by_phone(db, '777-888-9999')[0] == 'contact_002'
+    assert cm.generate_contact_id(db) == 'contact_003'
+    print("   ✓ Imported contacts are indexed")
+    
+    # The caller's rows are neither filled in nor shared with the database
+    assert rows[0] == {'first_name': 'Alice', 'last_name': 'Johnson', 'phone': '111-222-3333'}
+    rows[3]['category'] = 'family'
+    assert list(cm.search_contacts_by_category(db, 'work')) == ['contact_002']
+    assert db['contact_002']['category'] == 'work'
+    print("   ✓ Input rows are copied, not aliased")
+    
+    print("Bulk import tests passed!\n")
+
+def test_file_round_trip():
+    """Test saving and streaming contacts back from a file."""
+    print("Testing file round trip...")
+    
+    import os
+    import tempfile
+    
+    db = cm.ContactDatabase()
+    cm.add_contacts_bulk(db, [
+        {'first_name': 'Alice', 'last_name': 'Johnson', 'phone': '111-222-3333',
+         'address': {'street': '1 Main St', 'city': '', 'state': 'CA', 'zip_code': ''},
+         'category': 'work'},
+        {'first_name': 'Bob', 'last_name': 'Smith', 'phone': '444-555-6666'},
+    ])
+    
+    fd, filename = tempfile.mkstemp(suffix='.txt')
+    os.close(fd)
+    try:
+        cm.save_contacts_to_file(db, filename)
+        
+        # Every field, including empty ones and the address, survives
+        loaded = cm.load_contacts_from_file(filename)
+        assert loaded == db
+        print("   ✓ Save/load round trip is lossless")
+        
+        # The parser is lazy, so callers can stop early or filter
+        records = cm.iter_contacts_from_file(filename)
+        assert next(records)[0] == 'contact_001'
+        records.close()
+        work = cm.load_contacts_from_file(
+            filename, lambda contact_id, contact: contact['category'] == 'work')
+        assert list(work) == ['contact_001']
+        print("   ✓ Streaming parser supports early stop and filters")
+        
+        # Files written before escaping have no format line and are read as is
+        assert open(filename).readline() == 'format: 2\n'
+        with open(filename, 'w') as f:
+            f.write("=== contact_001 ===\nfirst_name: Old\n"
+                    "notes: C:\\new\\report and \\\\share\n\n")
+        old = cm.load_contacts_from_file(filename)
+        assert old['contact_001']['notes'] == 'C:\\new\\report and \\\\share'
+        with open(filename, 'w') as f:
+            f.write("format: 2\n\n=== contact_001 ===\nnotes: C:\\new\\\\x\n\n")
+        assert cm.load_contacts_from_file(filename)['contact_001']['notes'] == 'C:\new\\x'
+        print("   ✓ Values are only unescaped in files with the format line")
+    finally:
+        os.remove(filename)
+    
+    print("File round trip tests passed!\n")
+
+def test_binary_file_format():
+    """Test the binary file format against the text format."""
+    print("Testing binary file format...")
+    
+    import os
+    import tempfile
+    
+    db = cm.ContactDatabase()
+    cm.add_contacts_bulk(db, [
+        {'first_name': 'Zoë', 'last_name': 'Müller', 'phone': '111-222-3333',
+         'address': {'street': '1 Main St', 'city': 'Köln', 'state': '', 'zip_code': ''}},
+        {'first_name': 'Bob', 'last_name': 'Smith', 'phone': '444-555-6666',
+         'notes': 'Met at: the conference'},
+        {'first_name': 'Dan', 'last_name': 'Brown', 'phone': '222-333-4444',
+         'notes': 'line1\nline2: x\r\n=== contact_009 ===\nC:\\new\\',
+         'address': {'street': '1 Main St\nApt 2', 'city': '', 'state': '', 'zip_code': ''}},
+    ])
+    del db['contact_002']
+    cm.add_contact(db, {'first_name': 'Carol', 'last_name': 'Jones',
+                        'phone': '777-888-9999', 'email': '', 'address': {},
+                        'category': 'family', 'notes': '',
+                        'created_date': '2024-01-15', 'last_modified': '2024-01-15'})
+    
+    directory = tempfile.mkdtemp()
+    text_file = os.path.join(directory, 'contacts.txt')
+    binary_file = os.path.join(directory, 'contacts.cdb')
+    try:
+        # New files are binary unless asked otherwise
+        cm.save_contacts_to_file(db, binary_file)
+        assert cm.detect_contact_file_format(binary_file) == 'binary'
+        loaded = cm.load_contacts_from_file(binary_file)
+        assert loaded == db
+        assert cm.generate_contact_id(loaded) == 'contact_005'
+        print("   ✓ Binary round trip is lossless")
+        
+        # Converting through the text format gives back the same contacts
+        cm.save_contacts_to_file(loaded, text_file, file_format='text')
+        assert cm.detect_contact_file_format(text_file) == 'text'
+        from_text = cm.load_contacts_from_file(text_file)
+        # Existing files keep their format
+        cm.save_contacts_to_file(from_text, text_file)
+        assert cm.detect_contact_file_format(text_file) == 'text'
+        cm.save_contacts_to_file(from_text, binary_file)
+        assert cm.detect_contact_file_format(binary_file) == 'binary'
+        assert from_text == db
+        assert from_text['contact_003']['notes'] == 'line1\nline2: x\r\n=== contact_009 ===\nC:\\new\\'
+        assert cm.load_contacts_from_file(binary_file) == db
+        print("   ✓ Text and binary formats convert losslessly")
+        
+        # Contacts outside the fixed fields are kept as JSON records
+        odd = cm.ContactDatabase(db)
+        odd['contact_010'] = {'first_name': 'Eve', 'nickname': 'E\x1f', 'address': {'planet': 'Mars'}}
+        odd['contact_011'] = dict(db['contact_001'], created_date=20240115)
+        odd['contact_012'] = dict(db['contact_001'], notes='a\x1fb',
+                                  address={'city': 'Köln', 'state': 'NRW'})
+        cm.save_contacts_to_file(odd, binary_file, file_format='binary')
+        assert cm.load_contacts_from_file(binary_file) == odd
+        with cm.open_contacts_file(binary_file) as mapped:
+            assert mapped['contact_012']['address'] == {'city': 'Köln', 'state': 'NRW'}
+            assert [contact_id for contact_id, _ in mapped.find_by_field('notes', 'a\x1fb')] == ['contact_012']
+        print("   ✓ Contacts outside the fixed fields round trip")
+        
+        # Fixed fields and interned strings make the file smaller than text
+        many = cm.ContactDatabase()
+        cm.add_contacts_bulk(many, [{'first_name': f'Name{i}', 'last_name': 'Smith',
+                                     'phone': f'555-010-{i:04d}', 'category': 'work',
+                                     'address': {'street': f'{i} Main St', 'city': 'Austin',
+                                                 'state': 'TX', 'zip_code': '73301'}}
+                                    for i in range(200)])
+        cm.save_contacts_to_file(many, text_file, file_format='text')
+        cm.save_contacts_to_file(many, binary_file, file_format='binary')
+        assert os.path.getsize(binary_file) < 0.75 * os.path.getsize(text_file)
+        assert cm.load_contacts_from_file(binary_file) == many
+        print("   ✓ Binary files are smaller than text files")
+        
+        # Files of another binary version are refused, not parsed as text
+        with open(binary_file, 'r+b') as f:
+            f.write(b'CONTACT\x01')
+        assert cm.detect_contact_file_format(binary_file) == 'binary'
+        try:
+            cm.read_contacts_file(binary_file)
+            assert False, "an unknown binary version should be refused"
+        except ValueError:
+            pass
+        print("   ✓ Other binary versions are refused")
+    finally:
+        for filename in (text_file, binary_file):
+            if os.path.exists(filename):
+                os.remove(filename)
+        os.rmdir(directory)
+    
+    print("Binary file format tests passed!\n")
+
+def test_mapped_contacts_file():
+    """Test read-only random access to a binary contacts file."""
+    print("Testing memory-mapped contacts file...")
+    
+    import os
+    import tempfile
+    
+    db = cm.ContactDatabase()
+    cm.add_contacts_bulk(db, [
+        {'first_name': 'Alice', 'last_name': 'Johnson', 'phone': '111-222-3333',
+         'notes': 'phone: 444-555-6666'},
+        {'first_name': 'Bob', 'last_name': 'Smith', 'phone': '444-555-6666',
+         'email': 'bob@example.com'},
+    ])
+    
+    fd, filename = tempfile.mkstemp(suffix='.cdb')
+    os.close(fd)
+    try:
+        cm.save_contacts_to_file(db, filename, file_format='binary')
+        with cm.open_contacts_file(filename) as mapped:
+            assert len(mapped) == 2
+            assert list(mapped) == ['contact_001', 'contact_002']
+            assert mapped['contact_002'] == db['contact_002']
+            assert 'contact_000' not in mapped and 'contact_003' not in mapped
+            assert cm.display_contact(mapped, 'contact_001')
+            assert not cm.display_contact(mapped, 'contact_999')
+            print("   ✓ Contacts are read on demand")
+            
+            # Only the record whose phone field matches is returned
+            assert cm.find_contact_by_phone(mapped, '444-555-6666')[0] == 'contact_002'
+            assert cm.find_contact_by_phone(mapped, '000-000-0000') == (None, None)
+            assert cm.find_contact_by_email(mapped, 'bob@example.com')[0] == 'contact_002'
+            print("   ✓ Field lookups work on the mapped file")
+    finally:
+        os.remove(filename)
+    
+    print("Memory-mapped contacts file tests passed!\n")
+
+def test_contact_journal():
+    """Test journaled saving, replay and compaction."""
+    print("Testing contact journal...")
+    
+    import os
+    import tempfile
+    
+    directory = tempfile.mkdtemp()
+    filename = os.path.join(directory, 'contacts.txt')
+    contact = {
+        'first_name': 'Test',
+        'last_name': 'User',
+        'phone': '123-456-7890',
+        'email': '',
+        'address': {},
+        'category': 'personal',
+        'notes': '',
+        'created_date': '2024-01-15',
+        'last_modified': '2024-01-15'
+    }
+    try:
+        db = cm.open_journaled_contacts(filename, compact_every=0)
+        id1 = cm.add_contact(db, dict(contact))
+        id2 = cm.add_contact(db, dict(contact, first_name='Other'))
+        cm.update_contact(db, id1, {'notes': 'Updated'})
+        del db[id2]
+        db.journal.close()
+        
+        # Nothing was written to the snapshot, the log holds every change
+        assert not os.path.exists(filename)
+        reopened = cm.open_journaled_contacts(filename, compact_every=0)
+        assert reopened == db
+        assert cm.generate_contact_id(reopened) == 'contact_003'
+        print("   ✓ Log replay restores every change")
+        
+        # A torn last entry is ignored and removed
+        reopened.journal.close()
+        with open(filename + '.log', 'ab') as f:
+            f.write(b'["set","contact_009",{"first_')
+        reopened = cm.open_journaled_contacts(filename, compact_every=0)
+        assert reopened == db
+        print("   ✓ Torn log entries are dropped")
+        
+        # Compaction writes the snapshot and empties the log
+        reopened.journal.compact()
+        assert os.path.getsize(filename + '.log') == 0
+        reopened.journal.close()
+        assert cm.load_contacts_from_file(filename) == db
+        assert cm.detect_contact_file_format(filename) == 'binary'
+        print("   ✓ Compaction rewrites the snapshot")
+        
+        # An unreadable snapshot is refused instead of treated as empty
+        binary_file = os.path.join(directory, 'contacts.cdb')
+        cm.save_contacts_to_file(db, binary_file, file_format='binary')
+        with open(binary_file, 'r+b') as f:
+            f.truncate(os.path.getsize(binary_file) // 2)
+        snapshot = open(binary_file, 'rb').read()
+        try:
+            cm.open_journaled_contacts(binary_file)
+            assert False, "a truncated snapshot was opened"
+        except (ValueError, struct.error):
+            pass
+        assert open(binary_file, 'rb').read() == snapshot
+        assert not os.path.exists(binary_file + '.log')
+        print("   ✓ Unreadable snapshots are not journaled")
+    finally:
+        for name in os.listdir(directory):
+            os.remove(os.path.join(directory, name))
+        os.rmdir(directory)
+    
+    print("Contact journal tests passed!\n")
+
+def test_fuzzy_duplicates():
+    """Test near-duplicate detection with blocking keys."""
+    print("Testing fuzzy duplicate detection...")
+    
+    assert cm.soundex('Robert') == cm.soundex('Rupert') == 'R163'
+    assert cm.soundex('Jon') == cm.soundex('John')
+    assert cm.normalize_phone('(111) 222-3333') == '1112223333'
+    assert cm.edit_similarity('john smith', 'jon smith') == 0.9
+    assert cm.edit_similarity('john smith', 'carol jones', 0.85) == 0.0
+    print("   ✓ Blocking keys work correctly")
+    
+    db = cm.ContactDatabase()
+    cm.add_contacts_bulk(db, [
+        {'first_name': 'John', 'last_name': 'Smith', 'phone': '111-222-3333',
+         'email': 'john.smith@example.com'},
+        {'first_name': 'Jon', 'last_name': 'Smith', 'phone': '444-555-6666',
+         'email': 'John.Smith@exmaple.com'},
+        {'first_name': 'Carol', 'last_name': 'Jones', 'phone': '777-888-9999',
+         'email': 'john.smith@other.org'},
+    ])
+    db['contact_004'] = dict(db['contact_003'], phone='(111) 222 3333',
+                             first_name='Mary', email='')
+    # Numbered names only match the same number
+    db['contact_005'] = dict(db['contact_003'], phone='', first_name='Carol12', email='')
+    db['contact_006'] = dict(db['contact_003'], phone='', first_name='Carol13', email='')
+    
+    duplicates = cm.find_fuzzy_duplicate_contacts(db)
+    assert set(duplicates) == set(cm.find_duplicate_contacts(db))
+    assert duplicates['phone_duplicates'] == [['contact_001', 'contact_004']]
+    assert duplicates['email_duplicates'] == [['contact_001', 'contact_002']]
+    assert duplicates['name_duplicates'] == [['contact_001', 'contact_002']]
+    print("   ✓ Near-duplicates are found")
+    
+    print("Fuzzy duplicate tests passed!\n")
+
+def test_batch_merge():
+    """Test policy-driven merging of duplicate groups."""
+    print("Testing batch merge...")
+    
+    def build_db():
+        db = cm.ContactDatabase()
+        cm.add_contacts_bulk(db, [
+            {'first_name': 'John', 'last_name': 'Smith', 'phone': '111-222-3333',
+             'email': '', 'address': {'street': '1 Main St', 'city': ''},
+             'last_modified': '2024-01-10'},
+            {'first_name': 'Jon', 'last_name': 'Smith', 'phone': '111-222-3333',
+             'email': 'jon@example.com', 'address': {'street': '2 Oak Ave', 'city': 'Austin'},
+             'last_modified': '2024-02-01'},
+            {'first_name': 'Carol', 'last_name': 'Jones', 'phone': '777-888-9999'},
+        ])
+        return db
+    
+    db = build_db()
+    report = cm.merge_contact_groups(db, cm.find_duplicate_contacts(db), rule='prefer_first')
+    assert report['merged'] == {'contact_004': ['contact_001', 'contact_002']}
+    assert sorted(db) == ['contact_003', 'contact_004']
+    merged = db['contact_004']
+    assert merged['first_name'] == 'John'
+    assert merged['email'] == ''
+    assert merged['address'] == {'street': '1 Main St', 'city': 'Austin'}
+    assert merged['last_modified'] == '2024-02-01'
+    assert cm.find_contact_by_phone(db, '111-222-3333')[0] == 'contact_004'
+    print("   ✓ Groups are merged with the prefer-first rule")
+    
+    db = build_db()
+    report = cm.merge_contact_groups(db, [['contact_001', 'contact_002']], rule='newest')
+    assert db['contact_004']['first_name'] == 'Jon'
+    assert db['contact_004']['address']['street'] == '2 Oak Ave'
+    fields = {entry['field']: entry['chosen_from'] for entry in report['audit']}
+    assert fields['first_name'] == 'contact_002'
+    assert fields['address.street'] == 'contact_002'
+    print("   ✓ Newest rule and audit log work correctly")
+    
+    db = build_db()
+    cm.merge_contact_groups(db, [['contact_001', 'contact_002']], rule='non_empty')
+    assert db['contact_004']['email'] == 'jon@example.com'
+    print("   ✓ Non-empty rule works correctly")
+    
+    print("Batch merge tests passed!\n")
+
+def test_live_statistics():
+    """Test that running statistics follow every change."""
+    print("Testing live statistics...")
+    
+    db = cm.ContactDatabase()
+    cm.add_contacts_bulk(db, [
+        {'first_name': 'Alice', 'last_name': 'Johnson', 'phone': '111-222-3333',
+         'email': 'alice@example.com', 'address': {'state': 'CA'}, 'category': 'work'},
+        {'first_name': 'Bob', 'last_name': 'Smith', 'phone': '111-222-4444',
+         'address': {'state': 'NY'}},
+        {'first_name': 'Carol', 'last_name': 'Jones', 'phone': '555-666-7777',
+         'category': 'work'},
+    ])
+    stats = cm.generate_contact_statistics(db)
+    assert stats['total_contacts'] == 3
+    assert stats['contacts_by_category'] == {'work': 2, 'personal': 1}
+    assert stats['contacts_by_state'] == {'CA': 1, 'NY': 1}
+    assert stats['contacts_without_email'] == 2
+    assert stats['most_common_area_code'] == '111'
+    print("   ✓ Counters match the contacts")
+    
+    cm.update_contact(db, 'contact_002', {'email': 'bob@example.com',
+                                          'address': {'state': 'CA'}})
+    del db['contact_001']
+    cm.merge_contact_groups(db, [['contact_002', 'contact_003']])
+    stats = cm.generate_contact_statistics(db)
+    assert stats['total_contacts'] == 1
+    assert stats['contacts_by_state'] == {'CA': 1}
+    assert stats['contacts_without_email'] == 0
+    assert cm.verify_contact_statistics(db)
+    print("   ✓ Counters follow updates, deletes and merges")
+    
+    # The most common area code is kept between snapshots
+    for area_code in ['222', '333', '333', '222', '222']:
+        cm.add_contacts_bulk(db, [{'first_name': 'Area', 'last_name': area_code,
+                                   'phone': f'{area_code}-555-0000'}])
+        assert cm.verify_contact_statistics(db)
+    assert cm.generate_contact_statistics(db)['most_common_area_code'] == '222'
+    for contact_id in cm.search_contacts_by_name(db, '222'):
+        del db[contact_id]
+        assert cm.verify_contact_statistics(db)
+    assert cm.generate_contact_statistics(db)['most_common_area_code'] == '333'
+    print("   ✓ Most common area code follows inserts and deletes")
+    
+    print("Live statistics tests passed!\n")
+
+def test_name_search_index():
+    """Test substring and ranked name search through the n-gram index."""
+    print("Testing name search index...")
+    
+    db = cm.ContactDatabase()
+    cm.add_contacts_bulk(db, [
+        {'first_name': 'Johnathan', 'last_name': 'Lee', 'phone': '111-222-3333'},
+        {'first_name': 'Alice', 'last_name': 'Johnson', 'phone': '444-555-6666'},
+        {'first_name': 'John', 'last_name': 'Smith', 'phone': '777-888-9999'},
+    ])
+    plain = dict(db)
+    for term in ['john', 'o', 'jo', 'ohns', 'smith', 'xyz', '']:
+        assert cm.search_contacts_by_name(db, term) == cm.search_contacts_by_name(plain, term)
+    print("   ✓ Indexed search matches a full scan")
+    
+    ranked = cm.search_contacts_ranked(db, 'John', limit=2)
+    assert list(ranked) == ['contact_003', 'contact_002']
+    assert list(cm.search_contacts_ranked(plain, 'John')) == ['contact_003', 'contact_002', 'contact_001']
+    print("   ✓ Ranked search orders exact, shorter and prefix matches first")
+    
+    cm.update_contact(db, 'contact_003', {'first_name': 'Jack'})
+    assert 'contact_003' not in cm.search_contacts_by_name(db, 'john')
+    assert 'contact_003' in cm.search_contacts_by_name(db, 'jac')
+    print("   ✓ Renamed contacts are found under their new name")
+    
+    # An older contact renamed into an existing name keeps database order
+    cm.update_contact(db, 'contact_003', {'first_name': 'John'})
+    cm.update_contact(db, 'contact_001', {'first_name': 'John'})
+    assert db.lookup('name', 'john') == ['contact_001', 'contact_003']
+    plain = dict(db)
+    for term in ['john', 'jo', 'o', 'ohns', 'lee', 'xyz', '']:
+        for limit in (None, 0, 1, 2, 10):
+            assert (list(cm.search_contacts_ranked(db, term, limit))
+                    == list(cm.search_contacts_ranked(plain, term, limit)))
+    print("   ✓ Limited ranked search matches a full scan")
+    
+    print("Name search index tests passed!\n")
+
+def test_streaming_export():
+    """Test streaming category exports in every format."""
+    print("Testing streaming export...")
+    
+    import csv
+    import io
+    import json
+    
+    db = cm.ContactDatabase()
+    cm.add_contacts_bulk(db, [
+        {'first_name': 'Alice', 'last_name': 'Johnson', 'phone': '111-222-3333',
+         'address': {'street': '1 Main St', 'city': 'Austin', 'state': 'TX', 'zip_code': ''},
+         'category': 'work', 'notes': 'Likes "quotes", commas'},
+        {'first_name': 'Bob', 'last_name': 'Smith', 'phone': '444-555-6666'},
+        {'first_name': 'Carol', 'last_name': 'Jones', 'phone': '777-888-9999',
+         'category': 'work'},
+    ])
+    
+    text = cm.export_contacts_by_category(db, 'work')
+    assert text.startswith("--- Contacts in Category: work ---")
+    assert text.count("Contact ID:") == 2
+    assert "  Street: 1 Main St\n" in text
+    out = io.StringIO()
+    assert cm.write_category_export(db, 'work', out) == len(text)
+    assert out.getvalue() == text
+    assert cm.export_contacts_by_category(db, 'family') == "No contacts found in category 'family'."
+    print("   ✓ Text export streams the same layout")
+    
+    rows = list(csv.DictReader(io.StringIO(''.join(cm.iter_category_export(db, 'work', 'csv')))))
+    assert [row['contact_id'] for row in rows] == ['contact_001', 'contact_003']
+    assert rows[0]['notes'] == 'Likes "quotes", commas'
+    assert rows[0]['city'] == 'Austin'
+    lines = list(cm.iter_category_export(db, 'work', 'jsonl'))
+    assert [json.loads(line)['first_name'] for line in lines] == ['Alice', 'Carol']
+    print("   ✓ CSV and JSON Lines exports work correctly")
+    
+    # A contact moved into the category is exported in database order
+    cm.update_contact(db, 'contact_002', {'category': 'Work'})
+    assert [contact_id for contact_id, _ in cm.iter_contacts_in_category(db, 'WORK')] == [
+        'contact_001', 'contact_002', 'contact_003']
+    print("   ✓ Category streams follow database order")
+    
+    print("Streaming export tests passed!\n")
+
+def test_contact_store():
+    """Test the thread-safe store and its HTTP front end."""
+    print("Testing contact store...")
+    
+    import json
+    import threading
+    import urllib.error
+    import urllib.request
+    
+    store = cm.ContactStore()
+    errors = []
+    
+    def writer(start):
+        try:
+            for i in range(start, start + 50):
+                contact_id = store.add_contact({
+                    'first_name': f'Writer{i}', 'last_name': 'Test',
+                    'phone': f'555-000-{i:04d}', 'email': '', 'address': {},
+                    'category': 'work', 'notes': '',
+                    'created_date': '2024-01-15', 'last_modified': '2024-01-15'})
+                store.update_contact(contact_id, {'category': 'family'})
+        except Exception as e:
+            errors.append(e)
+    
+    def reader():
+        try:
+            for _ in range(50):
+                for contact in store.search_contacts_by_name('writer').values():
+                    assert contact['last_name'] == 'Test'
+                store.generate_contact_statistics()
+        except Exception as e:
+            errors.append(e)
+    
+    threads = [threading.Thread(target=writer, args=(i * 50,)) for i in range(4)]
+    threads += [threading.Thread(target=reader) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert len(store) == 200
+    assert len(store.search_contacts_by_category('family')) == 200
+    assert cm.verify_contact_statistics(store.contacts_db)
+    print("   ✓ Concurrent readers and writers stay consistent")
+    
+    # Writes finish the lazy index work, so searches never modify the database
+    assert not store.contacts_db._unordered_buckets
+    assert store.contacts_db.name_grams is not None
+    state = pickle.dumps(store.contacts_db)
+    assert dict(pickle.loads(state)) == dict(copy.deepcopy(store.contacts_db))
+    print("   ✓ Searches find the indexes up to date")
+    
+    # The store keeps its own copy of added contacts
+    contact = {'first_name': 'Copy', 'last_name': 'Check', 'phone': '555-111-2222',
+               'email': '', 'address': {'city': 'Austin'}, 'category': 'work',
+               'notes': '', 'created_date': '2024-01-15', 'last_modified': '2024-01-15'}
+    contact_id = store.add_contact(contact)
+    contact['category'] = 'family'
+    contact['address']['city'] = 'Boston'
+    assert store.get_contact(contact_id)['category'] == 'work'
+    assert store.get_contact(contact_id)['address'] == {'city': 'Austin'}
+    store.delete_contact(contact_id)
+    print("   ✓ Added contacts are copied into the store")
+    
+    server = cm.serve_contact_store(store, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base = f'http://127.0.0.1:{server.server_address[1]}'
+    try:
+        request = urllib.request.Request(
+            base + '/contacts', method='POST',
+            data=json.dumps({'first_name': 'Http', 'last_name': 'Client',
+                             'phone': '123-456-7890'}).encode())
+        with urllib.request.urlopen(request) as response:
+            contact_id = json.load(response)['contact_id']
+        with urllib.request.urlopen(base + '/search?name=http&limit=5') as response:
+            assert list(json.load(response)) == [contact_id]
+        with urllib.request.urlopen(base + '/stats') as response:
+            assert json.load(response)['total_contacts'] == 201
+        
+        # Malformed requests are answered with 400 and a JSON error
+        bad_requests = [
+            ('POST', '/contacts', b'not json'),
+            ('POST', '/contacts', b'[1, 2]'),
+            ('POST', '/contacts', json.dumps({'first_name': 'A', 'last_name': 'B',
+                                              'phone': 1234567890}).encode()),
+            ('PATCH', f'/contacts/{contact_id}', json.dumps({'address': 'Main St'}).encode()),
+            ('PATCH', f'/contacts/{contact_id}', b'"x"'),
+            ('GET', '/search?name=http&limit=x', None),
+            ('GET', '/search?name=http&limit=-1', None),
+        ]
+        for method, path, body in bad_requests:
+            request = urllib.request.Request(base + path, method=method, data=body)
+            try:
+                urllib.request.urlopen(request)
+                assert False, f"{method} {path} was accepted"
+            except urllib.error.HTTPError as e:
+                assert e.code == 400
+                assert 'error' in json.load(e)
+        assert store.get_contact(contact_id)['last_name'] == 'Client'
+        assert len(store) == 201
+    finally:
+        server.shutdown()
+        server.server_close()
+    print("   ✓ HTTP front end serves the store and rejects bad requests")
+    
+    print("Contact store tests passed!\n")
+
+def test_compact_contacts():
+    """Test compact contact records against plain dictionaries."""
+    print("Testing compact contacts...")
+    
+    contact = {
+        'first_name': 'Alice',
+        'last_name': 'Johnson',
+        'phone': '111-222-3333',
+        'email': 'alice@example.com',
+        'address': {'street': '1 Main St', 'city': 'Austin', 'state': 'TX', 'zip_code': ''},
+        'category': 'work',
+        'notes': '',
+        'created_date': '2024-01-15',
+        'last_modified': '2024-02-01'
+    }
+    compact = cm.compact_contact(contact)
+    assert isinstance(compact, cm.CompactContact)
+    assert compact == contact and compact.to_dict() == contact
+    assert compact['address']['city'] == 'Austin'
+    assert compact.get('missing') is None
+    partial = dict(contact, address={'state': 'CA'})
+    assert cm.compact_contact(partial) == partial
+    assert cm.compact_contact(dict(contact, extra='x')) == dict(contact, extra='x')
+    print("   ✓ Compact records read like dictionaries")
+    
+    db = cm.ContactDatabase({'contact_001': dict(contact)})
+    assert cm.compact_contacts(db) == 1
+    text = cm.export_contacts_by_category(db, 'work')
+    assert "  City: Austin\n" in text
+    assert cm.display_contact(db, 'contact_001')
+    assert cm.find_contact_by_phone(db, '111-222-3333')[0] == 'contact_001'
+    
+    cm.update_contact(db, 'contact_001', {'phone': '999-888-7777', 'address': {'city': 'Dallas'}})
+    assert isinstance(db['contact_001'], cm.CompactContact)
+    assert db['contact_001']['address']['city'] == 'Dallas'
+    assert cm.find_contact_by_phone(db, '999-888-7777')[0] == 'contact_001'
+    assert cm.verify_contact_statistics(db)
+    print("   ✓ Compact records work with the contact functions")
+    
+    print("Compact contact tests passed!\n")
+
+def test_validator_registry():
+    """Test the shared, precompiled validator registry."""
+    print("Testing validator registry...")
+    
+    validators = cm.validators
+    
+    phones = ['555-123-4567', '5551234567', '555-123-456a', '']
+    assert validators.validate_many('contact_phone', phones) == [cm.validate_phone(p) for p in phones]
+    assert validators.validate_many('contact_email', ['a@b.com', 'bad']) == [True, False]
+    print("   ✓ Batch validation matches the single-value validators")
+    
+    before = validators.cache_stats()
+    for _ in range(10):
+        cm.validate_phone('555-123-4567')
+    after = validators.cache_stats()
+    assert after['lookups'] == before['lookups'] + 10
+    assert after['compilations'] == before['compilations']
+    
+    registry = validators.ValidatorRegistry()
+    registry.register('digits', r'^\d+$')
+    assert registry.cache_stats() == {'lookups': 0, 'compilations': 0, 'compiled': 0}
+    assert [registry.validate('digits', value) for value in ['12', 'x', '3']] == [True, False, True]
+    assert registry.cache_stats() == {'lookups': 3, 'compilations': 1, 'compiled': 1}
+    print("   ✓ Patterns are compiled once and reused")
+    
+    validators.register('contact_phone', r'^\d{3}-\d{3}-\d{4}$')
+    try:
+        validators.register('contact_phone', r'^\d+$')
+        assert False, "Conflicting pattern should be rejected"
+    except ValueError:
+        pass
+    print("   ✓ Conflicting registrations are rejected")
+    
+    print("Validator registry tests passed!\n")
+
 def run_all_tests():
     """Run all test functions and report results."""
     print("Running all tests for Contact Management System...\n")
@@ -238,6 +1010,21 @@ def run_all_tests():
         test_search_functionality()
         test_contact_operations()
         test_data_analysis()
+        test_contact_indexes()
+        test_contact_id_allocation()
+        test_bulk_import()
+        test_file_round_trip()
+        test_binary_file_format()
+        test_mapped_contacts_file()
+        test_contact_journal()
+        test_fuzzy_duplicates()
+        test_batch_merge()
+        test_live_statistics()
+        test_name_search_index()
+        test_streaming_export()
+        test_contact_store()
+        test_compact_contacts()
+        test_validator_registry()
         
         print("All tests passed! ✅")
         return True
@@ -2,7 +2,29 @@
 # Luis Arellano
 # 2025-09-14
 
+import datetime
+import importlib.util
+import os
 import re
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import accumulate, islice
+from time import perf_counter, sleep
+
+# The shared validator registry lives in the repository root. It is loaded
+# from there by path, once for all homework modules, rather than by putting
+# the repository root on sys.path
+validators = sys.modules.get('cs1350_validators')
+if validators is None:
+    _spec = importlib.util.spec_from_file_location('cs1350_validators', os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'cs1350_validators.py'))
+    validators = importlib.util.module_from_spec(_spec)
+    sys.modules['cs1350_validators'] = validators
+    _spec.loader.exec_module(validators)
 
 def format_receipt(items, prices, quantities):
     if len(items) != len(prices) or len(items) != len(quantities):
@@ -117,45 +139,209 @@ def analyze_text(text):
         'exclamations': exclamations
     }
 
-def find_patterns(text):
-    patterns = {
-        'integers': r'\b\d+\b',
-        'decimals': r'\b\d+\.\d+\b',
-        'words_with_digits': r'\b\w*\d\w*\b',
-        'capitalized_words': r'\b[A-Z][a-z]*\b',
-        'all_caps_words': r'\b[A-Z]{2,}\b',
-        'repeated_chars': r'\b\w*(\w)\1\w*\b'
-    }
-    
-    results = {}
-    for key, pattern in patterns.items():
-        if key == 'repeated_chars':
-            word_pattern = r'\b\w*(\w)\1\w*\b'
-            words_with_repeats = []
-            for match in re.finditer(word_pattern, text):
-                words_with_repeats.append(match.group())
-            results[key] = words_with_repeats
+PATTERN_SENTENCE_BREAK = re.compile(r'[.!?]')
+
+class TextSummary:
+    # Running totals for analyze_text, so a text can be read in chunks.
+    # Chunks are put back together into lines; words never span lines and
+    # sentences are followed from line to line.
+    
+    def __init__(self):
+        self.total_chars = 0
+        self.total_words = 0
+        self.word_lengths = 0
+        self.word_count = {}
+        self.longest_line = None
+        self.words_per_line = []
+        self.capitalized_sentences = 0
+        self.questions = 0
+        self.exclamations = 0
+        # True until the first non-space character of a sentence is seen
+        self.sentence_start = True
+        # Pieces of the line that has not ended yet
+        self.partial_line = []
+        self.finished = False
+    
+    def add(self, chunk):
+        if self.finished:
+            raise ValueError("TextSummary already returned its result")
+        if not chunk:
+            return
+        self.total_chars += len(chunk)
+        self.questions += chunk.count('?')
+        self.exclamations += chunk.count('!')
+        
+        if '\n' not in chunk:
+            self.partial_line.append(chunk)
+            return
+        lines = chunk.split('\n')
+        self.partial_line.append(lines[0])
+        lines[0] = ''.join(self.partial_line)
+        self.partial_line = [lines.pop()]
+        for line in lines:
+            self._add_line(line)
+    
+    def _add_line(self, line):
+        words = line.split()
+        self.total_words += len(words)
+        self.words_per_line.append(len(words))
+        word_count = self.word_count
+        for word in words:
+            self.word_lengths += len(word)
+            clean_word = word.strip('.,!?;:').lower()
+            if clean_word:
+                word_count[clean_word] = word_count.get(clean_word, 0) + 1
+        
+        if self.longest_line is None or len(line) > len(self.longest_line):
+            self.longest_line = line
+        
+        for i, sentence in enumerate(PATTERN_SENTENCE_BREAK.split(line)):
+            if i:
+                self.sentence_start = True
+            if self.sentence_start:
+                sentence = sentence.lstrip()
+                if sentence:
+                    if sentence[0].isupper():
+                        self.capitalized_sentences += 1
+                    self.sentence_start = False
+    
+    def result(self):
+        # Ends the text, so call it after the last chunk
+        if not self.finished:
+            self.finished = True
+            if self.total_chars:
+                self._add_line(''.join(self.partial_line))
+            self.partial_line = []
+        
+        if not self.total_chars:
+            return {
+                'total_chars': 0, 'total_words': 0, 'total_lines': 0,
+                'avg_word_length': 0, 'most_common_word': '', 'longest_line': '',
+                'words_per_line': [], 'capitalized_sentences': 0,
+                'questions': 0, 'exclamations': 0
+            }
+        
+        if self.total_words > 0:
+            avg_word_length = round(self.word_lengths / self.total_words, 2)
         else:
-            matches = re.findall(pattern, text)
-            results[key] = matches
+            avg_word_length = 0
+        
+        if self.word_count:
+            most_common_word = max(self.word_count.items(), key=lambda x: x[1])[0]
+        else:
+            most_common_word = ''
+        
+        return {
+            'total_chars': self.total_chars,
+            'total_words': self.total_words,
+            'total_lines': len(self.words_per_line),
+            'avg_word_length': avg_word_length,
+            'most_common_word': most_common_word,
+            'longest_line': self.longest_line,
+            'words_per_line': list(self.words_per_line),
+            'capitalized_sentences': self.capitalized_sentences,
+            'questions': self.questions,
+            'exclamations': self.exclamations
+        }
+
+def analyze_text_stream(source, chunk_size=1024 * 1024):
+    # source is a file path, read like open(path).read() would but in
+    # chunks, or any iterable of text chunks
+    summary = TextSummary()
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, encoding='utf-8') as text_file:
+            for chunk in iter(lambda: text_file.read(chunk_size), ''):
+                summary.add(chunk)
+    else:
+        for chunk in source:
+            summary.add(chunk)
+    return summary.result()
+
+# find_patterns reads the text once. Every pattern except decimals matches
+# whole \w+ runs, so the text is split into those runs, keeping a decimal
+# as one "12.5" token, and each distinct token is classified only once.
+# That classification runs in Python, so the saving over six separate scans
+# depends on the text: large on prose that repeats its words, small when
+# most tokens are distinct (random numbers, identifiers, a huge vocabulary).
+PATTERN_TOKEN = re.compile(r'\w(?:(?<=\d)\d*\.\d+\b|\w*)')
+PATTERN_DIGIT = re.compile(r'\d')
+PATTERN_CAPITALIZED = re.compile(r'[A-Z][a-z]*')
+PATTERN_ALL_CAPS = re.compile(r'[A-Z]{2,}')
+PATTERN_REPEATED = re.compile(r'(\w)\1')
+
+def split_decimals(tokens):
+    # "12.5" tokens back into "12", "5"; no other token contains a '.'
+    return '.'.join(tokens).split('.') if tokens else []
+
+def find_patterns(text):
+    tokens = PATTERN_TOKEN.findall(text)
+    
+    decimals = set()
+    integers = set()
+    with_digits = set()
+    capitalized = set()
+    all_caps = set()
+    upper_start = set()
+    # token -> its parts that have repeated characters, joined by '.'
+    repeated = {}
+    
+    for token in set(tokens):
+        if '.' in token:
+            # Both halves of a decimal are integers
+            decimals.add(token)
+            if PATTERN_REPEATED.search(token):
+                repeated[token] = '.'.join(part for part in token.split('.')
+                                           if PATTERN_REPEATED.search(part))
+            continue
+        
+        if token.isdecimal():
+            integers.add(token)
+        elif PATTERN_DIGIT.search(token):
+            with_digits.add(token)
+        elif 'A' <= token[0] <= 'Z':
+            upper_start.add(token)
+            if PATTERN_CAPITALIZED.fullmatch(token):
+                capitalized.add(token)
+            if PATTERN_ALL_CAPS.fullmatch(token):
+                all_caps.add(token)
+        if PATTERN_REPEATED.search(token):
+            repeated[token] = token
+    
+    # One pass over all tokens per group, smaller patterns filter the group
+    integers |= decimals
+    with_digits |= integers
+    digit_tokens = list(filter(with_digits.__contains__, tokens))
+    upper_tokens = list(filter(upper_start.__contains__, tokens))
+    repeated_tokens = list(filter(repeated.__contains__, tokens))
+    if not decimals.isdisjoint(repeated):
+        repeated_tokens = split_decimals(list(map(repeated.__getitem__, repeated_tokens)))
     
-    return results
+    return {
+        'integers': split_decimals(list(filter(integers.__contains__, digit_tokens))),
+        'decimals': list(filter(decimals.__contains__, digit_tokens)),
+        'words_with_digits': split_decimals(digit_tokens),
+        'capitalized_words': list(filter(capitalized.__contains__, upper_tokens)),
+        'all_caps_words': list(filter(all_caps.__contains__, upper_tokens)),
+        'repeated_chars': repeated_tokens
+    }
+
+FORMAT_PATTERNS = {
+    'phone': r'^\((\d{3})\)\s*(\d{3})-(\d{4})$|^(\d{3})-(\d{3})-(\d{4})$',
+    'date': r'^(0[1-9]|1[0-2])/(0[1-9]|[12]\d|3[01])/(\d{4})$',
+    'time': r'^([01]?\d|2[0-3]):([0-5]\d)\s*([AP]M)?$|^([01]?\d):([0-5]\d)\s*([ap]m)$',
+    'email': r'^(\w+[.\w]*)@(\w+[-\w]*)\.([a-zA-Z]{2,})$',
+    'url': r'^https?://([\w-]+\.)+[\w-]+(/[\w\-./?%&=]*)?$',
+    'ssn': r'^(\d{3})-(\d{2})-(\d{4})$'
+}
+
+for format_name, format_pattern in FORMAT_PATTERNS.items():
+    validators.register('format_' + format_name, format_pattern)
 
 def validate_format(input_string, format_type):
-    patterns = {
-        'phone': r'^\((\d{3})\)\s*(\d{3})-(\d{4})$|^(\d{3})-(\d{3})-(\d{4})$',
-        'date': r'^(0[1-9]|1[0-2])/(0[1-9]|[12]\d|3[01])/(\d{4})$',
-        'time': r'^([01]?\d|2[0-3]):([0-5]\d)\s*([AP]M)?$|^([01]?\d):([0-5]\d)\s*([ap]m)$',
-        'email': r'^(\w+[.\w]*)@(\w+[-\w]*)\.([a-zA-Z]{2,})$',
-        'url': r'^https?://([\w-]+\.)+[\w-]+(/[\w-./?%&=]*)?$',
-        'ssn': r'^(\d{3})-(\d{2})-(\d{4})$'
-    }
-    
-    pattern = patterns.get(format_type)
-    if not pattern:
+    if format_type not in FORMAT_PATTERNS:
         return False, None
     
-    match = re.match(pattern, input_string.strip())
+    match = validators.pattern('format_' + format_type).match(input_string.strip())
     
     if not match:
         return False, None
@@ -215,150 +401,777 @@ def extract_information(text):
     
     return results
 
+class CharacterDeletion(dict):
+    # A str.translate table that deletes every character matched by one of
+    # the single-character patterns. Characters are checked against the
+    # patterns the first time they are seen and simply looked up after that.
+    
+    def __init__(self, patterns):
+        super().__init__()
+        self.patterns = [re.compile(pattern) for pattern in patterns]
+    
+    def __missing__(self, code):
+        character = chr(code)
+        if any(pattern.match(character) for pattern in self.patterns):
+            self[code] = None
+        else:
+            self[code] = code
+        return self[code]
+    
+    def __call__(self, text):
+        return text.translate(self)
+
+PATTERN_URL = re.compile(r'https?://\S+')
+PATTERN_EMAIL = re.compile(r'\S+@\S+\.\S+')
+PATTERN_SENTENCE_END = re.compile(r'([.!?] )')
+
+def remove_extra_spaces(text):
+    # str.split() and \s agree on what whitespace is
+    return ' '.join(text.split())
+
+def remove_urls(text):
+    return PATTERN_URL.sub('', text) if '://' in text else text
+
+def remove_emails(text):
+    return PATTERN_EMAIL.sub('', text) if '@' in text else text
+
+def capitalize_sentences(text):
+    # Every other piece is a sentence, the ones between are '. ' and such
+    pieces = PATTERN_SENTENCE_END.split(text)
+    pieces[::2] = [sentence[:1].upper() + sentence[1:] for sentence in pieces[::2]]
+    return ''.join(pieces)
+
+# Operations that delete single characters. Deleting one set of characters
+# and then another is the same as deleting both at once, so a run of these
+# becomes a single pass.
+CHARACTER_DELETIONS = {
+    'remove_punctuation': r'[^\w\s]',
+    'remove_digits': r'\d'
+}
+
+CLEANING_OPERATIONS = {
+    'trim': str.strip,
+    'lowercase': str.lower,
+    'remove_punctuation': CharacterDeletion([CHARACTER_DELETIONS['remove_punctuation']]),
+    'remove_digits': CharacterDeletion([CHARACTER_DELETIONS['remove_digits']]),
+    'remove_extra_spaces': remove_extra_spaces,
+    'remove_urls': remove_urls,
+    'remove_emails': remove_emails,
+    'capitalize_sentences': capitalize_sentences
+}
+
+class TextPipeline:
+    # clean_text_pipeline with the operations looked up once, so the same
+    # cleaning can be applied to many texts. Unless record_steps is set,
+    # runs of character deletions are fused into one pass, trims next to
+    # remove_extra_spaces (which trims already) are dropped and unknown
+    # operations, which never change the text, are left out.
+    
+    def __init__(self, operations, record_steps=False):
+        self.operations = list(operations)
+        self.record_steps = record_steps
+        if record_steps:
+            self.stages = [CLEANING_OPERATIONS.get(operation, str) for operation in self.operations]
+        else:
+            self.stages = self._fuse(self.operations)
+    
+    @staticmethod
+    def _fuse(operations):
+        known = [operation for operation in operations if operation in CLEANING_OPERATIONS]
+        kept = []
+        for i, operation in enumerate(known):
+            if operation == 'trim' and 'remove_extra_spaces' in known[max(i - 1, 0):i + 2]:
+                continue
+            kept.append(operation)
+        
+        stages = []
+        deletions = []
+        for operation in kept + [None]:
+            if operation in CHARACTER_DELETIONS:
+                if CHARACTER_DELETIONS[operation] not in deletions:
+                    deletions.append(CHARACTER_DELETIONS[operation])
+                continue
+            if deletions:
+                stages.append(CharacterDeletion(deletions))
+            deletions = []
+            if operation is not None:
+                stages.append(CLEANING_OPERATIONS[operation])
+        return stages
+    
+    def apply(self, text):
+        # The cleaned text only
+        if not text:
+            return text
+        for stage in self.stages:
+            text = stage(text)
+        return text
+    
+    def apply_many(self, texts):
+        stages = self.stages
+        cleaned = []
+        for text in texts:
+            if text:
+                for stage in stages:
+                    text = stage(text)
+            cleaned.append(text)
+        return cleaned
+    
+    def run(self, text):
+        # The clean_text_pipeline result, steps are only kept if recorded
+        if not text:
+            return {'original': text, 'cleaned': text, 'steps': []}
+        if not self.record_steps:
+            return {'original': text, 'cleaned': self.apply(text), 'steps': []}
+        
+        current_text = text
+        steps = [current_text]
+        for stage in self.stages:
+            current_text = stage(current_text)
+            steps.append(current_text)
+        return {'original': text, 'cleaned': current_text, 'steps': steps}
+
+def compile_text_pipeline(operations, record_steps=False):
+    return TextPipeline(operations, record_steps)
+
 def clean_text_pipeline(text, operations):
-    if not text:
-        return {'original': text, 'cleaned': text, 'steps': []}
-    
-    current_text = text
-    steps = [current_text]
-    
-    for operation in operations:
-        if operation == 'trim':
-            current_text = current_text.strip()
-        elif operation == 'lowercase':
-            current_text = current_text.lower()
-        elif operation == 'remove_punctuation':
-            current_text = re.sub(r'[^\w\s]', '', current_text)
-        elif operation == 'remove_digits':
-            current_text = re.sub(r'\d', '', current_text)
-        elif operation == 'remove_extra_spaces':
-            current_text = re.sub(r'\s+', ' ', current_text).strip()
-        elif operation == 'remove_urls':
-            current_text = re.sub(r'https?://\S+', '', current_text)
-        elif operation == 'remove_emails':
-            current_text = re.sub(r'\S+@\S+\.\S+', '', current_text)
-        elif operation == 'capitalize_sentences':
-            sentences = re.split(r'([.!?] )', current_text)
-            current_text = ''
-            for i in range(0, len(sentences), 2):
-                if i < len(sentences):
-                    sentence = sentences[i]
-                    if sentence:
-                        current_text += sentence[0].upper() + sentence[1:]
-                    if i + 1 < len(sentences):
-                        current_text += sentences[i + 1]
+    return compile_text_pipeline(operations, record_steps=True).run(text)
+
+CONTRACTIONS = {
+    "don't": "do not", "won't": "will not", "can't": "cannot",
+    "I'm": "I am", "You're": "you are", "It's": "it is",
+    "he's": "he is", "she's": "she is", "We're": "we are",
+    "they're": "they are", "I've": "I have", "You've": "you have",
+    "We've": "we have", "they've": "they have"
+}
+
+NUMBER_WORDS = {
+    '0': 'zero', '1': 'one', '2': 'two', '3': 'three', '4': 'four',
+    '5': 'five', '6': 'six', '7': 'seven', '8': 'eight', '9': 'nine'
+}
+
+PATTERN_PHONE_NUMBER = re.compile(r'\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}')
+PATTERN_SPACE_BEFORE_PUNCTUATION = re.compile(r'\s+([.,!?;:])')
+PATTERN_PUNCTUATION_BEFORE_WORD = re.compile(r'([.,!?;:])(\w)')
+
+class WordReplacer:
+    # Replaces the keys of two tables in one scan of the text: literals
+    # wherever they occur and words only as whole words. This is the one
+    # rule for every table, the defaults included: the text is read from
+    # left to right, the longest key starting at a position wins, and text
+    # that has been replaced is never scanned again. Replacing the keys one
+    # after another gives the same text as long as keys do not run into
+    # each other; it differs when a replacement, or the text around it,
+    # forms another key ("don'they're" is "do nothey're", not "do nothey
+    # are") and when keys overlap ({'a': '1', 'ab': '2'} turns "ab" into
+    # "2" whatever the order of the table).
+    
+    def __init__(self, literals=None, words=None):
+        literals = {key: value for key, value in (literals or {}).items() if key}
+        words = {key: value for key, value in (words or {}).items() if key}
+        
+        alternatives = []
+        if literals:
+            alternatives.append('|'.join(map(re.escape, sorted(literals, key=len, reverse=True))))
+        if words:
+            alternatives.append(r'\b(?:%s)\b' % '|'.join(
+                map(re.escape, sorted(words, key=len, reverse=True))))
+        self.pattern = re.compile('|'.join(alternatives)) if alternatives else None
         
-        steps.append(current_text)
+        # A key in both tables is found as a literal first
+        self.table = dict(words)
+        self.table.update(literals)
     
-    return {
-        'original': text,
-        'cleaned': current_text,
-        'steps': steps
-    }
+    def replacement(self, match):
+        return self.table[match.group()]
+    
+    def __call__(self, text):
+        if self.pattern is None:
+            return text
+        return self.pattern.sub(self.replacement, text)
+
+# Compiled replacers for the tables used most recently
+@lru_cache(maxsize=32)
+def compile_word_replacer(literal_items, word_items):
+    return WordReplacer(dict(literal_items), dict(word_items))
 
-def smart_replace(text, replacements):
+def get_word_replacer(literals, words):
+    return compile_word_replacer(tuple(literals.items()), tuple(words.items()))
+
+def smart_replace(text, replacements, contractions=None, number_words=None):
+    # contractions and number_words replace the default tables, they are
+    # compiled once and then cost the same as the defaults. Both tables are
+    # replaced together in a single pass, see WordReplacer.
     if not text:
         return text
     
     result = text
     
-    contractions = {
-        "don't": "do not", "won't": "will not", "can't": "cannot",
-        "I'm": "I am", "You're": "you are", "It's": "it is",
-        "he's": "he is", "she's": "she is", "We're": "we are",
-        "they're": "they are", "I've": "I have", "You've": "you have",
-        "We've": "we have", "they've": "they have"
-    }
-    
-    number_words = {
-        '0': 'zero', '1': 'one', '2': 'two', '3': 'three', '4': 'four',
-        '5': 'five', '6': 'six', '7': 'seven', '8': 'eight', '9': 'nine'
-    }
-    
     if replacements.get('censor_phone'):
-        phone_pattern = r'\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}'
-        result = re.sub(phone_pattern, 'XXX-XXX-XXXX', result)
+        result = PATTERN_PHONE_NUMBER.sub('XXX-XXX-XXXX', result)
     
-    if replacements.get('censor_email'):
-        email_pattern = r'\S+@\S+\.\S+'
-        result = re.sub(email_pattern, '[EMAIL]', result)
+    if replacements.get('censor_email') and '@' in result:
+        result = PATTERN_EMAIL.sub('[EMAIL]', result)
     
     if replacements.get('fix_spacing'):
-        result = re.sub(r'\s+([.,!?;:])', r'\1', result)
-        result = re.sub(r'([.,!?;:])(\w)', r'\1 \2', result)
+        result = PATTERN_SPACE_BEFORE_PUNCTUATION.sub(r'\1', result)
+        result = PATTERN_PUNCTUATION_BEFORE_WORD.sub(r'\1 \2', result)
     
+    literals = {}
     if replacements.get('expand_contractions'):
-        for contraction, expansion in contractions.items():
-            result = result.replace(contraction, expansion)
-    
+        literals = CONTRACTIONS if contractions is None else contractions
+    words = {}
     if replacements.get('number_to_word'):
-        for digit, word in number_words.items():
-            result = re.sub(r'\b' + digit + r'\b', word, result)
+        words = NUMBER_WORDS if number_words is None else number_words
+    if literals or words:
+        result = get_word_replacer(literals, words)(result)
     
     return result
 
-def analyze_log_file(log_text):
-    if not log_text:
+# Pipelines compiled in this process, by operations
+compiled_pipelines = {}
+
+def clean_document_chunk(task):
+    # Runs in a worker: the pipeline, then smart_replace, over one chunk
+    operations, replacements, documents = task
+    pipeline = compiled_pipelines.get(operations)
+    if pipeline is None:
+        pipeline = compiled_pipelines[operations] = TextPipeline(operations)
+    cleaned = pipeline.apply_many(documents)
+    if replacements:
+        cleaned = [smart_replace(document, replacements) for document in cleaned]
+    return cleaned
+
+def read_documents(path):
+    # One document per line
+    with open(path, encoding='utf-8', newline='\n') as documents:
+        for line in documents:
+            yield line[:-1] if line.endswith('\n') else line
+
+class CorpusCleaner:
+    # Cleans a large corpus of documents with compile_text_pipeline and then
+    # smart_replace, in chunks spread over a process pool. Only a few chunks
+    # per worker are in flight at a time, so documents are read as they are
+    # needed and cleaned ones come back in input order as soon as possible.
+    # documents, seconds and docs_per_sec() tell how fast it went.
+    
+    def __init__(self, operations=(), replacements=None, workers=None,
+                 chunk_size=1000, progress=None):
+        self.operations = tuple(operations)
+        self.replacements = dict(replacements or {})
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        # Called with stats() after every chunk
+        self.progress = progress
+        self.documents = 0
+        self.seconds = 0.0
+    
+    def docs_per_sec(self):
+        return self.documents / self.seconds if self.seconds else 0.0
+    
+    def stats(self):
         return {
-            'total_entries': 0, 'error_count': 0, 'warning_count': 0,
-            'info_count': 0, 'dates': [], 'error_messages': [],
-            'time_range': ('', ''), 'most_active_hour': 0
+            'documents': self.documents,
+            'seconds': round(self.seconds, 3),
+            'docs_per_sec': round(self.docs_per_sec(), 1),
+            'workers': self.workers,
+            'chunk_size': self.chunk_size
         }
     
-    lines = log_text.strip().split('\n')
-    log_pattern = r'\[(\d{4}-\d{2}-\d{2}) (\d{2}:\d{2}:\d{2})\] (\w+): (.*)'
-    
-    entries = []
-    error_count = 0
-    warning_count = 0
-    info_count = 0
-    dates = set()
-    error_messages = []
-    times = []
-    hour_counts = {}
-    
-    for line in lines:
-        match = re.match(log_pattern, line.strip())
-        if match:
+    def _tasks(self, documents):
+        if isinstance(documents, (str, os.PathLike)):
+            documents = read_documents(documents)
+        documents = iter(documents)
+        while True:
+            chunk = list(islice(documents, self.chunk_size))
+            if not chunk:
+                return
+            yield (self.operations, self.replacements, chunk)
+    
+    def _finished(self, cleaned, started):
+        self.documents += len(cleaned)
+        self.seconds = perf_counter() - started
+        if self.progress:
+            self.progress(self.stats())
+        return cleaned
+    
+    def clean(self, documents):
+        # documents is an iterable of strings or a file path, one per line
+        self.documents = 0
+        self.seconds = 0.0
+        started = perf_counter()
+        
+        if self.workers == 1:
+            for task in self._tasks(documents):
+                yield from self._finished(clean_document_chunk(task), started)
+            return
+        
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            pending = deque()
+            try:
+                for task in self._tasks(documents):
+                    pending.append(pool.submit(clean_document_chunk, task))
+                    if len(pending) >= 2 * self.workers:
+                        yield from self._finished(pending.popleft().result(), started)
+                while pending:
+                    yield from self._finished(pending.popleft().result(), started)
+            finally:
+                # Stopped early, don't wait for chunks nobody will read
+                for future in pending:
+                    future.cancel()
+
+def clean_corpus_file(input_path, output_path, **options):
+    # Clean a file of documents, one per line, into another one. The
+    # options are those of CorpusCleaner. Returns its stats().
+    cleaner = CorpusCleaner(**options)
+    with open(output_path, 'w', encoding='utf-8', newline='\n') as output:
+        for document in cleaner.clean(input_path):
+            output.write(document + '\n')
+    return cleaner.stats()
+
+LOG_PATTERN = re.compile(r'\[(\d{4}-\d{2}-\d{2}) (\d{2}:\d{2}:\d{2})\] (\w+): (.*)')
+
+class LogSummary:
+    # Running totals for analyze_log_file, so a log can be read one line at a
+    # time without keeping the lines or the parsed entries around
+    
+    def __init__(self):
+        self.total_entries = 0
+        self.error_count = 0
+        self.warning_count = 0
+        self.info_count = 0
+        self.dates = set()
+        self.error_messages = []
+        self.first_time = None
+        self.last_time = None
+        # 'HH' -> entries, in the order the hours were first seen
+        self.hour_counts = {}
+    
+    def add_lines(self, lines):
+        match_line = LOG_PATTERN.match
+        dates = self.dates
+        error_messages = self.error_messages
+        hour_counts = self.hour_counts
+        first_time = self.first_time
+        last_time = self.last_time
+        
+        for line in lines:
+            match = match_line(line.strip())
+            if not match:
+                continue
             date, time, level, message = match.groups()
-            entries.append({
-                'date': date, 'time': time, 'level': level, 'message': message
-            })
-            
+            self.total_entries += 1
             dates.add(date)
-            times.append(time)
             
-            if level.upper() == 'ERROR':
-                error_count += 1
+            level = level.upper()
+            if level == 'ERROR':
+                self.error_count += 1
                 error_messages.append(message)
-            elif level.upper() == 'WARNING':
-                warning_count += 1
-            elif level.upper() == 'INFO':
-                info_count += 1
+            elif level == 'WARNING':
+                self.warning_count += 1
+            elif level == 'INFO':
+                self.info_count += 1
             
-            hour = int(time.split(':')[0])
+            if first_time is None or time < first_time:
+                first_time = time
+            if last_time is None or time > last_time:
+                last_time = time
+            
+            hour = time[:2]
             hour_counts[hour] = hour_counts.get(hour, 0) + 1
-    
-    if times:
-        time_range = (min(times), max(times))
+        
+        self.first_time = first_time
+        self.last_time = last_time
+    
+    def add_line(self, line):
+        self.add_lines((line,))
+    
+    def merge(self, other):
+        # Add the totals of a summary of the lines that come after ours
+        self.total_entries += other.total_entries
+        self.error_count += other.error_count
+        self.warning_count += other.warning_count
+        self.info_count += other.info_count
+        self.dates |= other.dates
+        self.error_messages.extend(other.error_messages)
+        if other.first_time is not None:
+            if self.first_time is None or other.first_time < self.first_time:
+                self.first_time = other.first_time
+            if self.last_time is None or other.last_time > self.last_time:
+                self.last_time = other.last_time
+        # New hours keep the order they were first seen in
+        for hour, count in other.hour_counts.items():
+            self.hour_counts[hour] = self.hour_counts.get(hour, 0) + count
+        return self
+    
+    def result(self):
+        if self.hour_counts:
+            most_active_hour = int(max(self.hour_counts.items(), key=lambda x: x[1])[0])
+        else:
+            most_active_hour = 0
+        
+        return {
+            'total_entries': self.total_entries,
+            'error_count': self.error_count,
+            'warning_count': self.warning_count,
+            'info_count': self.info_count,
+            'dates': sorted(self.dates),
+            'error_messages': list(self.error_messages),
+            'time_range': (self.first_time or '', self.last_time or ''),
+            'most_active_hour': most_active_hour
+        }
+
+def analyze_log_file(log_text):
+    summary = LogSummary()
+    if log_text:
+        summary.add_lines(log_text.split('\n'))
+    return summary.result()
+
+def read_log_lines(source):
+    # source is a file path or any iterable of lines, e.g. an open file
+    if isinstance(source, (str, os.PathLike)):
+        # Split on '\n' only, like analyze_log_file does
+        with open(source, encoding='utf-8', errors='replace', newline='\n') as log_file:
+            yield from log_file
     else:
-        time_range = ('', '')
+        yield from source
+
+def analyze_log_stream(source):
+    # Only the totals are kept, so the log can be larger than memory
+    summary = LogSummary()
+    summary.add_lines(read_log_lines(source))
+    return summary.result()
+
+class LogFollower:
+    # Keeps analyze_log_file totals for a log that is still being written.
+    # Every poll() parses only the complete lines appended since the last
+    # one. When the file is rotated (the path now names a new file) the old
+    # file is read to its end first. When it is truncated in place it is
+    # read again from the start, which is noticed by the file getting
+    # shorter or by its first bytes changing (it may have grown past the
+    # old offset since). Totals keep adding up in both cases.
+    
+    # How many leading bytes are compared to notice a rewritten file
+    fingerprint_size = 64
+    
+    def __init__(self, path, block_size=1024 * 1024):
+        self.path = path
+        self.block_size = block_size
+        self.summary = LogSummary()
+        self.log_file = None
+        self.offset = 0
+        # The first bytes read from the file
+        self.fingerprint = b''
+        # Start of a line that has not been finished yet
+        self.pending = b''
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def close(self):
+        if self.log_file is not None:
+            self.log_file.close()
+            self.log_file = None
+    
+    def _open(self):
+        self.offset = 0
+        self.fingerprint = b''
+        self.pending = b''
+        try:
+            self.log_file = open(self.path, 'rb')
+        except FileNotFoundError:
+            self.log_file = None
+    
+    def _rotated(self):
+        try:
+            current = os.stat(self.path)
+        except FileNotFoundError:
+            # Moved away and not recreated yet, keep reading the old file
+            return False
+        following = os.fstat(self.log_file.fileno())
+        return (current.st_dev, current.st_ino) != (following.st_dev, following.st_ino)
+    
+    def _truncated(self):
+        descriptor = self.log_file.fileno()
+        if os.fstat(descriptor).st_size < self.offset:
+            return True
+        return os.pread(descriptor, len(self.fingerprint), 0) != self.fingerprint
+    
+    def _read_new(self):
+        while True:
+            block = self.log_file.read(self.block_size)
+            if not block:
+                break
+            if len(self.fingerprint) < self.fingerprint_size:
+                self.fingerprint = (self.fingerprint + block)[:self.fingerprint_size]
+            self.offset += len(block)
+            data = self.pending + block
+            end = data.rfind(b'\n') + 1
+            self.pending = data[end:]
+            if end:
+                self.summary.add_lines(data[:end].decode('utf-8', 'replace').split('\n'))
+    
+    def poll(self):
+        # Returns the number of new log entries
+        before = self.summary.total_entries
+        if self.log_file is None:
+            self._open()
+            if self.log_file is None:
+                return 0
+        
+        if self._truncated():
+            self.log_file.seek(0)
+            self.offset = 0
+            self.fingerprint = b''
+            self.pending = b''
+        
+        rotated = self._rotated()
+        self._read_new()
+        if rotated:
+            # The old file is finished, so its last line is too
+            if self.pending:
+                self.summary.add_line(self.pending.decode('utf-8', 'replace'))
+            self.close()
+            self._open()
+            if self.log_file is not None:
+                self._read_new()
+        
+        return self.summary.total_entries - before
     
-    if hour_counts:
-        most_active_hour = max(hour_counts.items(), key=lambda x: x[1])[0]
+    def snapshot(self):
+        # The analyze_log_file result for everything read so far
+        return self.summary.result()
+
+def follow_log_file(path, interval=1.0):
+    # Yield the updated result every time new entries are appended
+    with LogFollower(path) as follower:
+        while True:
+            if follower.poll():
+                yield follower.snapshot()
+            else:
+                sleep(interval)
+
+def split_log_file(path, shard_size):
+    # Byte ranges of about shard_size that start and end on line boundaries
+    file_size = os.path.getsize(path)
+    shards = []
+    start = 0
+    with open(path, 'rb') as log_file:
+        while start < file_size:
+            log_file.seek(min(start + shard_size, file_size))
+            log_file.readline()
+            end = min(log_file.tell(), file_size)
+            shards.append((path, start, end))
+            start = end
+    return shards
+
+def summarize_log_range(shard):
+    path, start, end = shard
+    summary = LogSummary()
+    with open(path, 'rb') as log_file:
+        log_file.seek(start)
+        text = log_file.read(end - start).decode('utf-8', 'replace')
+    summary.add_lines(text.split('\n'))
+    return summary
+
+def analyze_logs_parallel(paths, workers=None, shard_size=32 * 1024 * 1024):
+    # Analyze one or many log files across a process pool. Large files are
+    # split into shards, every shard becomes a LogSummary in a worker, and
+    # the summaries are merged in file order, so the result is the same as
+    # analyze_log_stream over all the files one after another.
+    if isinstance(paths, (str, os.PathLike)):
+        paths = [paths]
+    
+    shards = []
+    for path in paths:
+        shards.extend(split_log_file(path, shard_size))
+    
+    summary = LogSummary()
+    if workers == 1 or len(shards) <= 1:
+        for shard in shards:
+            summary.merge(summarize_log_range(shard))
     else:
-        most_active_hour = 0
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for partial in pool.map(summarize_log_range, shards):
+                summary.merge(partial)
+    return summary.result()
+
+EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+# The 'HH:MM:SS' part of a time, or as much of it as is given
+TIME_FIELDS = re.compile(r'\d\d(?::?\d\d){0,2}')
+
+class LogIndex:
+    # Parsed log entries stored column by column and sorted by time, so
+    # questions like "all ERRORs between 10:30 and 11:00 on 2024-01-15" are
+    # answered by binary search instead of reparsing the log:
+    #   times          - seconds since 1970-01-01 (log times are taken as UTC)
+    #   levels         - index into level_names
+    #   message_starts - offset of every message in one '\n' joined string,
+    #                    plus the end offset of the last one
+    # For each level the positions and times of its entries are kept too,
+    # so a level and time range query is two more binary searches.
+    
+    def __init__(self, lines=()):
+        self.level_names = []
+        self.level_codes = {}
+        # Entries whose date or time is not a real one, e.g. 2024-13-01
+        self.skipped = 0
+        
+        times = array('q')
+        levels = array('H')
+        messages = []
+        day_starts = {}
+        match_line = LOG_PATTERN.match
+        
+        for line in lines:
+            match = match_line(line.strip())
+            if not match:
+                continue
+            date, time, level, message = match.groups()
+            
+            day_start = day_starts.get(date)
+            if day_start is None:
+                try:
+                    day = datetime.date(int(date[:4]), int(date[5:7]), int(date[8:]))
+                except ValueError:
+                    self.skipped += 1
+                    continue
+                day_start = day_starts[date] = (day.toordinal() - EPOCH_ORDINAL) * 86400
+            hour, minute, second = int(time[:2]), int(time[3:5]), int(time[6:])
+            if hour > 23 or minute > 59 or second > 59:
+                self.skipped += 1
+                continue
+            
+            level = level.upper()
+            code = self.level_codes.get(level)
+            if code is None:
+                code = self.level_codes[level] = len(self.level_names)
+                self.level_names.append(level)
+            
+            times.append(day_start + hour * 3600 + minute * 60 + second)
+            levels.append(code)
+            messages.append(message)
+        
+        if any(times[i] > times[i + 1] for i in range(len(times) - 1)):
+            # Stable, so entries with the same time stay in log order
+            order = sorted(range(len(times)), key=times.__getitem__)
+            times = array('q', [times[i] for i in order])
+            levels = array('H', [levels[i] for i in order])
+            messages = [messages[i] for i in order]
+        
+        self.times = times
+        self.levels = levels
+        # Day number -> 'YYYY-MM-DD', reused when entries are rebuilt
+        self.day_names = {day_start // 86400: datetime.date.fromordinal(
+                              EPOCH_ORDINAL + day_start // 86400).isoformat()
+                          for day_start in day_starts.values()}
+        self.messages = '\n'.join(messages)
+        self.message_starts = array('q', accumulate((len(message) + 1 for message in messages),
+                                                    initial=0))
+        
+        self.level_positions = [array('q') for _ in self.level_names]
+        for position, code in enumerate(levels):
+            self.level_positions[code].append(position)
+        self.level_times = [array('q', [times[i] for i in positions])
+                            for positions in self.level_positions]
+    
+    def __len__(self):
+        return len(self.times)
+    
+    @staticmethod
+    def _seconds(value, end):
+        # 'YYYY-MM-DD', then optionally ' HH', ':MM' and ':SS', read like
+        # datetime.fromisoformat does, or seconds. Fields left out are 0 at
+        # the start of a range; at the end the whole day, hour or minute
+        # they leave open is included.
+        if value is None or isinstance(value, int):
+            return value
+        moment = datetime.datetime.fromisoformat(value)
+        if moment.tzinfo is not None:
+            moment = moment.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+        seconds = (moment.toordinal() - EPOCH_ORDINAL) * 86400 + (
+            moment.hour * 3600 + moment.minute * 60 + moment.second)
+        if not end:
+            # Log times are whole seconds
+            return seconds + (moment.microsecond > 0)
+        fields = len(TIME_FIELDS.match(value, 11).group().replace(':', '')) // 2 if len(value) > 10 else 0
+        return seconds + (86400, 3600, 60, 1)[fields] - 1
+    
+    def message(self, position):
+        return self.messages[self.message_starts[position]:self.message_starts[position + 1] - 1]
+    
+    def entry(self, position):
+        # The entry in the same shape analyze_log_file parses it into
+        day, second = divmod(self.times[position], 86400)
+        return {
+            'date': self.day_names[day],
+            'time': f"{second // 3600:02d}:{second // 60 % 60:02d}:{second % 60:02d}",
+            'level': self.level_names[self.levels[position]],
+            'message': self.message(position)
+        }
     
-    return {
-        'total_entries': len(entries),
-        'error_count': error_count,
-        'warning_count': warning_count,
-        'info_count': info_count,
-        'dates': sorted(list(dates)),
-        'error_messages': error_messages,
-        'time_range': time_range,
-        'most_active_hour': most_active_hour
-    }
+    def _span(self, start, end, code):
+        # First and past-the-last index from start to end, both included,
+        # in times or, for one level, in that level's times
+        times = self.times if code is None else self.level_times[code]
+        low = 0 if start is None else bisect_left(times, self._seconds(start, False))
+        high = len(times) if end is None else bisect_right(times, self._seconds(end, True))
+        return low, max(low, high)
+    
+    def positions(self, start=None, end=None, level=None, contains=None):
+        # Positions of the entries from start to end (both included), with
+        # the given level and containing the given text, in time order
+        code = None
+        if level is not None:
+            code = self.level_codes.get(level.upper())
+            if code is None:
+                return []
+        
+        if contains is None:
+            low, high = self._span(start, end, code)
+            if code is None:
+                return list(range(low, high))
+            return self.level_positions[code][low:high].tolist()
+        
+        low, high = self._span(start, end, None)
+        if '\n' in contains or low == high:
+            return []
+        
+        # Search the messages of the range as one string, jumping to the
+        # next message after every hit
+        found = []
+        messages = self.messages
+        starts = self.message_starts
+        levels = self.levels
+        limit = starts[high] - 1
+        offset = messages.find(contains, starts[low], limit)
+        while offset != -1:
+            position = bisect_right(starts, offset, low, high) - 1
+            if code is None or levels[position] == code:
+                found.append(position)
+            offset = messages.find(contains, starts[position + 1], limit)
+        return found
+    
+    def count(self, start=None, end=None, level=None, contains=None):
+        if contains is None:
+            code = None
+            if level is not None:
+                code = self.level_codes.get(level.upper())
+                if code is None:
+                    return 0
+            low, high = self._span(start, end, code)
+            return high - low
+        return len(self.positions(start, end, level, contains))
+    
+    def query(self, start=None, end=None, level=None, contains=None):
+        return [self.entry(position)
+                for position in self.positions(start, end, level, contains)]
+
+def build_log_index(source):
+    # source is a file path or any iterable of lines, like analyze_log_stream
+    return LogIndex(read_log_lines(source))
 
 def run_tests():
     print("="*50)
@@ -382,6 +1195,10 @@ def run_tests():
     print(f"\nCleaned name: {cleaned.get('name', 'ERROR')}")
     print(f"Cleaned email: {cleaned.get('email', 'ERROR')}")
     
+    story = "The cat sat. Was it happy?\nYes! the cat was very happy.\n"
+    chunked = [story[i:i + 7] for i in range(0, len(story), 7)]
+    print(f"Streaming text analysis matches: {analyze_text_stream(chunked) == analyze_text(story)}")
+    
     print("\n" + "="*50)
     print("Testing Part 2: Regular Expressions")
     print("="*50)
@@ -411,6 +1228,19 @@ def run_tests():
     print(f"Original: '{cleaned_result.get('original', '')}'")
     print(f"Cleaned: '{cleaned_result.get('cleaned', '')}'")
     
+    pipeline = compile_text_pipeline(operations)
+    print(f"Compiled pipeline on a batch: {pipeline.apply_many([dirty_text, '  Second   TEXT '])}")
+    
+    cleaner = CorpusCleaner(operations, {'expand_contractions': True}, workers=2, chunk_size=2)
+    corpus = list(cleaner.clean([dirty_text, " I'm   HERE ", "  don't  stop "]))
+    print(f"Cleaned corpus: {corpus} ({cleaner.stats()['documents']} documents)")
+    
+    options = {'expand_contractions': True, 'number_to_word': True}
+    replaced = smart_replace("I can't find 2 of my 3 keys", options)
+    print(f"Smart replace: {replaced}")
+    replaced = smart_replace("We ain't done, 1 to go", options, {"ain't": "are not"}, {'1': 'uno'})
+    print(f"Custom tables: {replaced}")
+    
     print("\n" + "="*50)
     print("Testing Part 4: Log Analysis")
     print("="*50)
@@ -424,6 +1254,29 @@ def run_tests():
     print(f"Error count: {log_analysis.get('error_count', 0)}")
     print(f"Unique dates: {log_analysis.get('dates', [])}")
     
+    streamed = analyze_log_stream(iter(sample_log.split('\n')))
+    print(f"Streaming analysis matches: {streamed == log_analysis}")
+    
+    import tempfile
+    with tempfile.TemporaryDirectory() as log_dir:
+        log_path = os.path.join(log_dir, 'sample.log')
+        with open(log_path, 'w') as log_file:
+            log_file.write(sample_log)
+        sharded = analyze_logs_parallel([log_path, log_path], workers=2, shard_size=40)
+        
+        with LogFollower(log_path) as follower:
+            follower.poll()
+            with open(log_path, 'a') as log_file:
+                log_file.write("\n[2024-01-16 09:00:00] ERROR: Disk full\n")
+            new_entries = follower.poll()
+            followed = follower.snapshot()
+    print(f"Sharded analysis of two copies: {sharded.get('total_entries', 0)} entries")
+    print(f"Follow mode: {new_entries} new entries, {followed.get('error_count', 0)} errors so far")
+    
+    log_index = build_log_index(sample_log.split('\n'))
+    errors = log_index.query('2024-01-15 10:30:00', '2024-01-15 11:00:00', level='ERROR')
+    print(f"Indexed ERRORs 10:30-11:00: {[entry['message'] for entry in errors]}")
+    
     print("\n" + "="*50)
     print("All tests completed!")
     print("="*50)
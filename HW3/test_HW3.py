@@ -0,0 +1,560 @@
+"""
+Test cases for Text Processing
+CS1350 Week 3 Homework
+"""
+
+import datetime
+import io
+import os
+import random
+import re
+import tempfile
+
+import HW3 as tp
+
+# Reference versions: these replace, match and count the way the homework
+# first did, one step at a time, and the fast versions must agree with them.
+
+def reference_analyze_text(text):
+    """analyze_text as it was, reading the whole text at once."""
+    if not text:
+        return tp.TextSummary().result()
+    lines = text.split('\n')
+    words = text.split()
+    word_count = {}
+    for word in words:
+        clean_word = word.strip('.,!?;:').lower()
+        if clean_word:
+            word_count[clean_word] = word_count.get(clean_word, 0) + 1
+    capitalized_sentences = 0
+    for sentence in re.split(r'[.!?]', text):
+        sentence = sentence.strip()
+        if sentence and sentence[0].isupper():
+            capitalized_sentences += 1
+    return {
+        'total_chars': len(text),
+        'total_words': len(words),
+        'total_lines': len(lines),
+        'avg_word_length': round(sum(map(len, words)) / len(words), 2) if words else 0,
+        'most_common_word': max(word_count.items(), key=lambda x: x[1])[0] if word_count else '',
+        'longest_line': max(lines, key=len, default=''),
+        'words_per_line': [len(line.split()) for line in lines],
+        'capitalized_sentences': capitalized_sentences,
+        'questions': text.count('?'),
+        'exclamations': text.count('!')
+    }
+
+def in_chunks(text, size):
+    """The text cut into pieces of size characters."""
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+def reference_find_patterns(text):
+    """find_patterns as it was: one regular expression per group."""
+    patterns = {
+        'integers': r'\b\d+\b',
+        'decimals': r'\b\d+\.\d+\b',
+        'words_with_digits': r'\b\w*\d\w*\b',
+        'capitalized_words': r'\b[A-Z][a-z]*\b',
+        'all_caps_words': r'\b[A-Z]{2,}\b',
+    }
+    results = {key: re.findall(pattern, text) for key, pattern in patterns.items()}
+    results['repeated_chars'] = [match.group() for match in
+                                 re.finditer(r'\b\w*(\w)\1\w*\b', text)]
+    return results
+
+def reference_clean_text_pipeline(text, operations):
+    """clean_text_pipeline as it was: one regular expression per step."""
+    if not text:
+        return {'original': text, 'cleaned': text, 'steps': []}
+    current_text = text
+    steps = [current_text]
+    for operation in operations:
+        if operation == 'trim':
+            current_text = current_text.strip()
+        elif operation == 'lowercase':
+            current_text = current_text.lower()
+        elif operation == 'remove_punctuation':
+            current_text = re.sub(r'[^\w\s]', '', current_text)
+        elif operation == 'remove_digits':
+            current_text = re.sub(r'\d', '', current_text)
+        elif operation == 'remove_extra_spaces':
+            current_text = re.sub(r'\s+', ' ', current_text).strip()
+        elif operation == 'remove_urls':
+            current_text = re.sub(r'https?://\S+', '', current_text)
+        elif operation == 'remove_emails':
+            current_text = re.sub(r'\S+@\S+\.\S+', '', current_text)
+        elif operation == 'capitalize_sentences':
+            sentences = re.split(r'([.!?] )', current_text)
+            current_text = ''
+            for i in range(0, len(sentences), 2):
+                sentence = sentences[i]
+                if sentence:
+                    current_text += sentence[0].upper() + sentence[1:]
+                if i + 1 < len(sentences):
+                    current_text += sentences[i + 1]
+        steps.append(current_text)
+    return {'original': text, 'cleaned': current_text, 'steps': steps}
+
+def reference_smart_replace(text, replacements, contractions=None, number_words=None):
+    """smart_replace as it was: each key replaced one after another."""
+    result = text
+    if replacements.get('expand_contractions'):
+        for contraction, expansion in (contractions or tp.CONTRACTIONS).items():
+            result = result.replace(contraction, expansion)
+    if replacements.get('number_to_word'):
+        for digit, word in (number_words or tp.NUMBER_WORDS).items():
+            result = re.sub(r'\b' + re.escape(digit) + r'\b', word, result)
+    return result
+
+def make_log_text(rng, count):
+    """count random log lines, with a few that are not log entries."""
+    lines = []
+    for number in range(count):
+        if rng.random() < 0.05:
+            lines.append(rng.choice(['', 'not a log line', '[bad] ERROR: x']))
+            continue
+        level = rng.choice(['ERROR', 'WARNING', 'INFO', 'DEBUG'])
+        lines.append(f"[2024-01-{rng.randint(10, 20)} {rng.randrange(24):02d}:"
+                     f"{rng.randrange(60):02d}:{rng.randrange(60):02d}] {level}: event {number}")
+    return '\n'.join(lines) + '\n'
+
+def reference_log_query(text, start=None, end=None, level=None, contains=None):
+    """LogIndex.query as a linear filter over the parsed lines."""
+    # Bounds are padded to full 'YYYY-MM-DD HH:MM:SS' strings and compared
+    # as text: a start from the first second, an end to the last one
+    low = start and start + '0000-00-00 00:00:00'[len(start):]
+    high = end and end + '0000-00-00 23:59:59'[len(end):]
+    entries = []
+    for line in text.split('\n'):
+        match = tp.LOG_PATTERN.match(line.strip())
+        if not match:
+            continue
+        date, time, entry_level, message = match.groups()
+        try:
+            datetime.datetime.fromisoformat(f"{date} {time}")
+        except ValueError:
+            continue
+        moment = f"{date} {time}"
+        if ((low is None or moment >= low) and (high is None or moment <= high)
+                and (level is None or entry_level.upper() == level.upper())
+                and (contains is None or contains in message)):
+            entries.append({'date': date, 'time': time,
+                            'level': entry_level.upper(), 'message': message})
+    return sorted(entries, key=lambda entry: (entry['date'], entry['time']))
+
+def test_text_summary():
+    """Test analyzing a text in chunks against analyzing it at once."""
+    print("Testing TextSummary...")
+    text = "Hello there. how are you?\nI am fine! Thanks\n\n  for asking. Bye"
+    expected = reference_analyze_text(text)
+    assert tp.analyze_text(text) == expected
+
+    print("1. Testing chunks that end mid-word...")
+    assert tp.analyze_text_stream(["Hel", "lo the", "re. how are y", text[22:]]) == expected
+    assert tp.analyze_text_stream(in_chunks(text, 4)) == expected
+    print("   ✓ Words put back together")
+
+    print("2. Testing chunks that end mid-sentence...")
+    # Chunk ends right after a break, before a newline and before a capital
+    cut = text.index('!') + 1
+    assert tp.analyze_text_stream([text[:cut], text[cut:]]) == expected
+    cut = text.index('\n')
+    assert tp.analyze_text_stream([text[:cut], text[cut:cut + 1], text[cut + 1:]]) == expected
+    assert tp.analyze_text_stream(["a.", "\n", " ", "B c.", "", "\nD"]) == \
+        reference_analyze_text("a.\n B c.\nD")
+    print("   ✓ Sentences followed across chunks and lines")
+
+    print("3. Testing single-character chunks...")
+    assert tp.analyze_text_stream(in_chunks(text, 1)) == expected
+    for sample in ["", "\n", "?", "a", " \n ", "A\n\nb"]:
+        assert tp.analyze_text_stream(in_chunks(sample, 1)) == reference_analyze_text(sample), sample
+    print("   ✓ Same summary one character at a time")
+
+    print("4. Testing random text and chunks...")
+    pieces = ['a', 'Bc', ' ', '\t', '\n', '\n\n', '\r', '\xa0', '.', '. ', '! ', '?',
+              'É', 'x.', 'Hi', 'hi!', ',', '...']
+    rng = random.Random(25)
+    for _ in range(1000):
+        sample = ''.join(rng.choice(pieces) for _ in range(rng.randint(0, 12)))
+        expected = reference_analyze_text(sample)
+        for size in (1, 2, 3, 7):
+            assert tp.analyze_text_stream(in_chunks(sample, size)) == expected, (sample, size)
+    print("   ✓ Same summary for every chunk size")
+
+    print("5. Testing a file read in chunks...")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'text.txt')
+        with open(path, 'w', encoding='utf-8') as text_file:
+            text_file.write(text)
+        assert tp.analyze_text_stream(path, chunk_size=1) == reference_analyze_text(text)
+    summary = tp.TextSummary()
+    summary.result()
+    try:
+        summary.add("more")
+        assert False, "adding after result() should fail"
+    except ValueError:
+        pass
+    print("   ✓ File analyzed and finished summaries closed")
+
+    print("TextSummary tests passed!\n")
+
+def test_find_patterns():
+    """Test find_patterns against one regular expression per group."""
+    print("Testing find_patterns()...")
+
+    print("1. Testing a sentence...")
+    text = "In 2024, NASA and Apple shipped 3.14 gallons of coffee to room 101B."
+    found = tp.find_patterns(text)
+    assert found['integers'] == ['2024', '3', '14']
+    assert found['decimals'] == ['3.14']
+    assert found['all_caps_words'] == ['NASA']
+    assert found['repeated_chars'] == ['Apple', 'shipped', 'gallons', 'coffee', 'room']
+    assert found == reference_find_patterns(text)
+    print("   ✓ All six groups found")
+
+    print("2. Testing decimals that share a part...")
+    for text in ["1.2.3", "1.2.3.4", "11.22.33", "0.0.0 7.77", "1..2", "1.2.", ".5.55"]:
+        assert tp.find_patterns(text) == reference_find_patterns(text), text
+    assert tp.find_patterns("1.2.3")['decimals'] == ['1.2']
+    print("   ✓ Same decimals and integers as the regular expressions")
+
+    print("3. Testing non-ASCII digits and letters...")
+    for text in ["١٢.٣٤ and ٣٣", "x١ É2 Éé ²2", "Ünïcode ÀBC ÀÀ", "٣.٣.٣ 5.٥"]:
+        assert tp.find_patterns(text) == reference_find_patterns(text), text
+    assert tp.find_patterns("١٢.٣٤")['decimals'] == ['١٢.٣٤']
+    print("   ✓ Unicode digits counted as digits")
+
+    print("4. Testing random text...")
+    pieces = ['1', '22', '.', '1.2', '1.2.3', '١٢', '٣.٤', ' ', 'Ab', 'AB', 'AAb',
+              'aa', 'x1', '_', 'É', 'é', '²', '..', 'HELLO', 'Zz']
+    rng = random.Random(17)
+    for _ in range(3000):
+        text = ''.join(rng.choice(pieces) for _ in range(rng.randint(1, 8)))
+        assert tp.find_patterns(text) == reference_find_patterns(text), text
+    print("   ✓ Same groups as the regular expressions")
+
+    print("find_patterns() tests passed!\n")
+
+def test_text_pipeline():
+    """Test compiled pipelines against running each step on its own."""
+    print("Testing TextPipeline...")
+
+    print("1. Testing fused steps...")
+    operations = ['remove_digits', 'remove_punctuation', 'trim', 'remove_extra_spaces', 'lowercase']
+    pipeline = tp.compile_text_pipeline(operations)
+    assert len(pipeline.stages) == 3
+    assert isinstance(pipeline.stages[0], tp.CharacterDeletion)
+    text = "  Room 101:   the KEY, it's  here!  "
+    expected = reference_clean_text_pipeline(text, operations)
+    assert pipeline.apply(text) == expected['cleaned'] == "room the key its here"
+    assert pipeline.run(text) == {'original': text, 'cleaned': expected['cleaned'], 'steps': []}
+    assert tp.clean_text_pipeline(text, operations) == expected
+    print("   ✓ Deletions fused and trim dropped")
+
+    print("2. Testing CharacterDeletion...")
+    deletion = tp.CharacterDeletion([r'\d', r'[^\w\s]'])
+    assert deletion("a1 b٣, c_!") == "a b c_"
+    assert deletion[ord('1')] is None and deletion[ord('a')] == ord('a')
+    assert deletion("a1 b٣, c_!") == "a b c_"
+    print("   ✓ Characters deleted and remembered")
+
+    print("3. Testing trims next to other steps...")
+    for operations in [['trim', 'remove_extra_spaces'], ['remove_extra_spaces', 'trim'],
+                       ['trim', 'lowercase', 'remove_extra_spaces'], ['trim', 'unknown', 'trim'],
+                       ['remove_punctuation', 'trim', 'capitalize_sentences']]:
+        pipeline = tp.compile_text_pipeline(operations)
+        for text in ["  a . b  ", "\x1c\xa0 x. y \t", " ! ", ""]:
+            expected = reference_clean_text_pipeline(text, operations)
+            assert pipeline.apply(text) == expected['cleaned'], (operations, text)
+            assert tp.clean_text_pipeline(text, operations) == expected, (operations, text)
+    print("   ✓ Same text as every step run on its own")
+
+    print("4. Testing random pipelines...")
+    names = list(tp.CLEANING_OPERATIONS) + ['unknown']
+    pieces = ['a', 'B', ' ', '  ', '\t', '\n', '\x1c', '\xa0', '.', '. ', '! ', '?', ',',
+              '1', '٣', 'İ', 'é', '_', 'http://x.y/z', 'https://', 'a@b.c', '@', "'"]
+    rng = random.Random(22)
+    for _ in range(2000):
+        operations = [rng.choice(names) for _ in range(rng.randint(0, 6))]
+        texts = [''.join(rng.choice(pieces) for _ in range(rng.randint(0, 8))) for _ in range(3)]
+        pipeline = tp.compile_text_pipeline(operations)
+        expected = [reference_clean_text_pipeline(text, operations) for text in texts]
+        assert pipeline.apply_many(texts) == [result['cleaned'] for result in expected], operations
+        for text, result in zip(texts, expected):
+            assert pipeline.apply(text) == pipeline.run(text)['cleaned'] == result['cleaned']
+            assert tp.clean_text_pipeline(text, operations) == result, (operations, text)
+    print("   ✓ apply, apply_many and run agree with the steps")
+
+    print("TextPipeline tests passed!\n")
+
+def test_smart_replace():
+    """Test smart_replace against replacing the keys one after another."""
+    print("Testing smart_replace()...")
+    options = {'expand_contractions': True, 'number_to_word': True}
+
+    print("1. Testing the default tables...")
+    assert tp.smart_replace("I can't find 2 of my 3 keys", options) == \
+        "I cannot find two of my three keys"
+    assert tp.smart_replace("he'she's", options) == "he ishe is"
+    print("   ✓ Contractions and numbers replaced")
+
+    print("2. Testing random text made of the default keys...")
+    pieces = list(tp.CONTRACTIONS) + list(tp.NUMBER_WORDS) + \
+        ["'", 't', 'he', 'a', '10', "'re", 'x1', '1.5']
+    separators = [' ', '  ', '. ', ', ', '!', '\n', '-']
+    rng = random.Random(24)
+    for _ in range(3000):
+        text = ''.join(rng.choice(pieces) + rng.choice(separators)
+                       for _ in range(rng.randint(1, 8)))
+        assert tp.smart_replace(text, options) == reference_smart_replace(text, options), text
+    print("   ✓ Same text as one key at a time while keys stay apart")
+
+    print("3. Testing keys that run into each other...")
+    # One pass: replaced text is not scanned again, for every table
+    assert tp.smart_replace("don'they're", options) == "do nothey're"
+    assert reference_smart_replace("don'they're", options) == "do nothey are"
+    assert tp.smart_replace("abc", options, {'ab': 'x', 'xc': 'y'}, {}) == "xc"
+    assert tp.smart_replace("ab!", options, {'ab': 'x', 'x!': '?'}, {}) == "x!"
+    assert tp.smart_replace("ain't 2", options, {"ain't": "are 1"}) == "are 1 two"
+    # The longest key wins, whatever the order of the table
+    assert tp.smart_replace("ab", options, {'a': '1', 'ab': '2'}, {}) == "2"
+    assert tp.smart_replace("ab", options, {'ab': '2', 'a': '1'}, {}) == "2"
+    assert tp.smart_replace("ab", options, {'a': 'b', 'b': 'c'}, {}) == "bc"
+    print("   ✓ Longest key wins and replaced text is not scanned again")
+
+    print("4. Testing custom number words...")
+    replaced = tp.smart_replace("We ain't done, 1 to go", options, {"ain't": "are not"}, {'1': 'uno'})
+    assert replaced == "We are not done, uno to go"
+    assert tp.smart_replace("11 1.1 x1", options, {}, {'1': 'one', '11': 'eleven'}) == \
+        "eleven one.one x1"
+    print("   ✓ Whole words replaced")
+
+    print("5. Testing many custom tables...")
+    for number in range(100):
+        assert tp.smart_replace("a b", options, {'a': str(number)}, {}) == f"{number} b"
+    assert tp.compile_word_replacer.cache_info().currsize <= 32
+    print("   ✓ Only the latest compiled tables kept")
+
+    print("smart_replace() tests passed!\n")
+
+def test_corpus_cleaner():
+    """Test CorpusCleaner and clean_corpus_file against one document at a time."""
+    print("Testing CorpusCleaner...")
+    rng = random.Random(23)
+    phrases = ["I can't", "Visit https://example.com/x", "mail a.b@c.org", "  spaced   out ",
+               "it's DONE", "", "tab\tand\rreturn", "café 42"]
+    documents = [f"Doc {number}: " + " ".join(rng.sample(phrases, 3)) for number in range(500)]
+    documents[7] = ""
+    operations = ['remove_urls', 'lowercase', 'remove_extra_spaces']
+    replacements = {'expand_contractions': True, 'censor_email': True}
+    expected = [tp.smart_replace(reference_clean_text_pipeline(document, operations)['cleaned'],
+                                 replacements)
+                for document in documents]
+
+    print("1. Testing the order of cleaned documents...")
+    for workers, chunk_size in [(1, 1), (1, 64), (2, 3), (3, 50)]:
+        seen = []
+        cleaner = tp.CorpusCleaner(operations, replacements, workers=workers,
+                                   chunk_size=chunk_size,
+                                   progress=lambda stats: seen.append(stats['documents']))
+        assert list(cleaner.clean(iter(documents))) == expected, (workers, chunk_size)
+        assert cleaner.documents == len(documents)
+        assert seen == sorted(seen) and seen[-1] == len(documents)
+    print("   ✓ Same documents in input order for every worker count")
+
+    print("2. Testing a cleaner stopped early...")
+    cleaned = tp.CorpusCleaner(operations, replacements, workers=2, chunk_size=5).clean(documents)
+    assert [next(cleaned) for _ in range(12)] == expected[:12]
+    cleaned.close()
+    print("   ✓ First documents returned and the rest cancelled")
+
+    print("3. Testing clean_corpus_file...")
+    with tempfile.TemporaryDirectory() as directory:
+        input_path = os.path.join(directory, 'corpus.txt')
+        output_path = os.path.join(directory, 'cleaned.txt')
+        with open(input_path, 'w', encoding='utf-8', newline='') as corpus:
+            corpus.write('\n'.join(documents))
+        stats = tp.clean_corpus_file(input_path, output_path, operations=operations,
+                                     replacements=replacements, workers=2, chunk_size=7)
+        assert stats['documents'] == len(documents)
+        with open(output_path, encoding='utf-8', newline='') as cleaned_file:
+            assert cleaned_file.read() == ''.join(document + '\n' for document in expected)
+    print("   ✓ One cleaned document per line, in input order")
+
+    print("CorpusCleaner tests passed!\n")
+
+def test_log_summary():
+    """Test LogSummary and analyze_log_stream against analyze_log_file."""
+    print("Testing LogSummary...")
+    rng = random.Random(18)
+    text = make_log_text(rng, 1000)
+
+    print("1. Testing lines added in pieces and merged...")
+    lines = text.split('\n')
+    cuts = sorted(rng.sample(range(len(lines)), 10))
+    summary = tp.LogSummary()
+    for start, end in zip([0] + cuts, cuts + [len(lines)]):
+        part = tp.LogSummary()
+        part.add_lines(lines[start:end])
+        summary.merge(part)
+    assert summary.result() == tp.analyze_log_file(text)
+    assert tp.LogSummary().result() == tp.analyze_log_file("")
+    print("   ✓ Merged summaries equal one over the whole log")
+
+    print("2. Testing analyze_log_stream...")
+    # '\r\n' endings and padding are stripped the same way
+    text = text.replace('\n', '\r\n', 200).replace('\n[', '\n  [', 50)
+    assert tp.analyze_log_stream(io.StringIO(text)) == tp.analyze_log_file(text)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'app.log')
+        with open(path, 'w', encoding='utf-8', newline='') as log_file:
+            log_file.write(text + "[2024-01-21 08:00:00] ERROR: café, not ended")
+        with open(path, encoding='utf-8', newline='') as log_file:
+            expected = tp.analyze_log_file(log_file.read())
+        assert tp.analyze_log_stream(path) == expected
+    print("   ✓ Same result from a file and from lines")
+
+    print("LogSummary tests passed!\n")
+
+def test_logs_parallel():
+    """Test analyze_logs_parallel against analyzing the logs in order."""
+    print("Testing analyze_logs_parallel()...")
+    rng = random.Random(19)
+    texts = [make_log_text(rng, rng.randint(50, 400)) for _ in range(3)]
+    # Multi-byte characters and a last line without '\n'
+    texts[1] += "[2024-01-22 23:59:59] ERROR: déjà vu, not ended"
+    texts.append("")
+    with tempfile.TemporaryDirectory() as directory:
+        paths = []
+        for number, text in enumerate(texts):
+            paths.append(os.path.join(directory, f'app{number}.log'))
+            with open(paths[-1], 'w', encoding='utf-8', newline='') as log_file:
+                log_file.write(text)
+        expected = tp.analyze_log_file('\n'.join(texts))
+
+        print("1. Testing shards in one process...")
+        for shard_size in (1, 100, 4096, 10 ** 6):
+            assert tp.analyze_logs_parallel(paths, workers=1, shard_size=shard_size) == expected
+        assert tp.analyze_logs_parallel(paths[0]) == tp.analyze_log_file(texts[0])
+        print("   ✓ Same result for every shard size")
+
+        print("2. Testing shards in worker processes...")
+        assert tp.analyze_logs_parallel(paths, workers=2, shard_size=500) == expected
+        print("   ✓ Merged in file order")
+
+    print("analyze_logs_parallel() tests passed!\n")
+
+def test_log_follower():
+    """Test LogFollower against analyze_log_file."""
+    print("Testing LogFollower...")
+    rng = random.Random(20)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'app.log')
+        follower = tp.LogFollower(path, block_size=16)
+        assert follower.poll() == 0
+
+        print("1. Testing appended lines...")
+        text = make_log_text(rng, 300)
+        position = 0
+        while position < len(text):
+            step = rng.randint(1, 200)
+            with open(path, 'a') as log_file:
+                log_file.write(text[position:position + step])
+            position += step
+            follower.poll()
+        assert follower.snapshot() == tp.analyze_log_file(text)
+        print("   ✓ Same result as analyzing the whole file")
+
+        print("2. Testing a rotated file...")
+        rest = "[2024-01-21 10:00:00] ERROR: last line, not ended"
+        with open(path, 'a') as log_file:
+            log_file.write(rest)
+        os.rename(path, path + '.1')
+        rotated = "[2024-01-22 09:00:00] INFO: new file\n"
+        with open(path, 'w') as log_file:
+            log_file.write(rotated)
+        follower.poll()
+        text += rest + '\n' + rotated
+        assert follower.snapshot() == tp.analyze_log_file(text)
+        print("   ✓ Old file finished before the new one is read")
+
+        print("3. Testing a file truncated in place...")
+        with open(path, 'r+') as log_file:
+            log_file.truncate(0)
+        assert follower.poll() == 0
+        # Rewritten past the old offset before the next poll
+        rewritten = make_log_text(rng, 20)
+        assert len(rewritten) > len(rotated)
+        with open(path, 'w') as log_file:
+            log_file.write(rewritten)
+        follower.poll()
+        text += rewritten
+        assert follower.snapshot() == tp.analyze_log_file(text)
+        with open(path, 'w') as log_file:
+            log_file.write(rotated + rewritten)
+        follower.poll()
+        text += rotated + rewritten
+        assert follower.snapshot() == tp.analyze_log_file(text)
+        follower.close()
+        print("   ✓ Read again from the start, even once it grew back")
+
+    print("LogFollower tests passed!\n")
+
+def test_log_index():
+    """Test LogIndex queries against a linear filter."""
+    print("Testing LogIndex...")
+    rng = random.Random(21)
+    text = make_log_text(rng, 2000) + "[2024-13-01 10:00:00] ERROR: no such month\n"
+    index = tp.build_log_index(io.StringIO(text))
+    assert index.skipped == 1
+
+    print("1. Testing ranges with every precision...")
+    assert index.query('2024-01-15 10:30', '2024-01-15 11:00', 'ERROR') == \
+        reference_log_query(text, '2024-01-15 10:30', '2024-01-15 11:00', 'ERROR')
+    assert index.query('2024-01-12', '2024-01-12') == \
+        reference_log_query(text, '2024-01-12', '2024-01-12')
+    assert index.count('2024-01-15 10', '2024-01-15 10') == \
+        len(reference_log_query(text, '2024-01-15 10:00', '2024-01-15 10:59:59'))
+    print("   ✓ Hours and minutes padded like datetime.fromisoformat")
+
+    print("2. Testing random queries...")
+    for _ in range(300):
+        start, end = sorted(
+            f"2024-01-{rng.randint(9, 21):02d} {rng.randrange(24):02d}:{rng.randrange(60):02d}:"
+            f"{rng.randrange(60):02d}"[:rng.choice([10, 13, 16, 19])] for _ in range(2))
+        start = rng.choice([start, None])
+        end = rng.choice([end, None])
+        level = rng.choice([None, 'ERROR', 'warning', 'Info', 'TRACE'])
+        contains = rng.choice([None, None, 'event 1', '7', 'nothing'])
+        expected = reference_log_query(text, start, end, level, contains)
+        assert index.query(start, end, level, contains) == expected
+        assert index.count(start, end, level, contains) == len(expected)
+    print("   ✓ Same entries as filtering every line")
+
+    print("LogIndex tests passed!\n")
+
+def run_all_tests():
+    """Run all test functions and report results."""
+    print("Running all tests for Text Processing...\n")
+
+    try:
+        test_text_summary()
+        test_find_patterns()
+        test_text_pipeline()
+        test_smart_replace()
+        test_corpus_cleaner()
+        test_log_summary()
+        test_logs_parallel()
+        test_log_follower()
+        test_log_index()
+
+        print("All tests passed! ✅")
+        return True
+    except Exception as e:
+        print(f"Test failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+if __name__ == "__main__":
+    run_all_tests()
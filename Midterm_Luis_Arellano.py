@@ -21,27 +21,28 @@ def get_passing_students(gradebook):
 # PROBLEM 2: Regular Expressions
 # ==============================
 
-import re
+import cs1350_validators as validators
+
+# Matches xxx-xxx-xxxx or (xxx) xxx-xxxx
+validators.register('phone_text', r'\b\d{3}-\d{3}-\d{4}\b|\(\d{3}\) \d{3}-\d{4}')
+# Matches $x.xx, $xx.xx, $xxx.xx, etc.
+validators.register('price', r'\$\d+\.\d{2}')
+# Simple email pattern: word@word.word
+validators.register('simple_email', r'\b\w+@\w+\.\w+\b')
+# Exactly 2 letters followed by 4 digits
+validators.register('student_id', r'^[A-Za-z]{2}\d{4}$')
 
 def find_all_phones(text):
-    # Matches xxx-xxx-xxxx or (xxx) xxx-xxxx
-    pattern = r'\b\d{3}-\d{3}-\d{4}\b|\(\d{3}\) \d{3}-\d{4}'
-    return re.findall(pattern, text)
+    return validators.pattern('phone_text').findall(text)
 
 def find_all_prices(text):
-    # Matches $x.xx, $xx.xx, $xxx.xx, etc.
-    pattern = r'\$\d+\.\d{2}'
-    return re.findall(pattern, text)
+    return validators.pattern('price').findall(text)
 
 def extract_emails(text):
-    # Simple email pattern: word@word.word
-    pattern = r'\b\w+@\w+\.\w+\b'
-    return re.findall(pattern, text)
+    return validators.pattern('simple_email').findall(text)
 
 def validate_student_id(student_id):
-    # Exactly 2 letters followed by 4 digits
-    pattern = r'^[A-Za-z]{2}\d{4}$'
-    return bool(re.match(pattern, student_id))
+    return validators.validate('student_id', student_id)
 
 # ==============================
 # TESTING ALL FUNCTIONS
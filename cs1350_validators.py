@@ -0,0 +1,108 @@
+"""
+Shared regex validators for the homework modules.
+
+Every pattern is registered under a name and compiled only once, the first
+time it is used, instead of handing raw pattern strings to re.match() on
+every call and relying on the small re module cache.
+"""
+
+import re
+
+class ValidatorRegistry:
+    """
+    Named regex patterns, compiled once and shared by every module.
+
+    Counts pattern lookups and the re.compile() calls they needed, so
+    callers can check that a pattern used in a loop was compiled only once.
+    """
+
+    def __init__(self):
+        self._patterns = {}
+        self._compiled = {}
+        self.lookups = 0
+        self.compilations = 0
+
+    def register(self, kind, pattern, flags=0):
+        """
+        Register a pattern under a name. Registering the same pattern
+        again is a no-op, a different pattern for a used name is an error.
+
+        Args:
+            kind (str): Name to validate against, e.g. 'contact_phone'
+            pattern (str): Regular expression
+            flags (int): re flags
+        """
+        existing = self._patterns.get(kind)
+        if existing is not None and existing != (pattern, flags):
+            raise ValueError(f"Validator '{kind}' is already registered with another pattern")
+        self._patterns[kind] = (pattern, flags)
+
+    def pattern(self, kind):
+        """
+        Args:
+            kind (str): A registered name
+
+        Returns:
+            re.Pattern: The compiled pattern
+        """
+        self.lookups += 1
+        compiled = self._compiled.get(kind)
+        if compiled is not None:
+            return compiled
+
+        pattern, flags = self._patterns[kind]
+        self.compilations += 1
+        compiled = re.compile(pattern, flags)
+        self._compiled[kind] = compiled
+        return compiled
+
+    def validate(self, kind, value):
+        """
+        Returns:
+            bool: True if the pattern matches at the start of value
+        """
+        return self.pattern(kind).match(value) is not None
+
+    def validate_many(self, kind, values):
+        """
+        Validate a batch of values with one pattern lookup.
+
+        Args:
+            kind (str): A registered name
+            values (iterable): Strings to validate
+
+        Returns:
+            list: One bool per value
+        """
+        match = self.pattern(kind).match
+        return [match(value) is not None for value in values]
+
+    def cache_stats(self):
+        """
+        Returns:
+            dict: lookups, compilations (re.compile() calls) and number
+            of compiled patterns
+        """
+        return {
+            'lookups': self.lookups,
+            'compilations': self.compilations,
+            'compiled': len(self._compiled),
+        }
+
+# The registry shared by all modules
+registry = ValidatorRegistry()
+
+def register(kind, pattern, flags=0):
+    registry.register(kind, pattern, flags)
+
+def pattern(kind):
+    return registry.pattern(kind)
+
+def validate(kind, value):
+    return registry.validate(kind, value)
+
+def validate_many(kind, values):
+    return registry.validate_many(kind, values)
+
+def cache_stats():
+    return registry.cache_stats()